@@ -1,4 +1,5 @@
 __all__ = ['hunspell']
 
 from ._version import __version__  # noqa: F401
-from .hunspell import HunspellWrap as Hunspell, HunspellFilePathError  # noqa: F401
+from .hunspell import HunspellWrap as Hunspell, MultiHunspellWrap as MultiHunspell, HunspellFilePathError  # noqa: F401
+from .client import HunspellClient  # noqa: F401
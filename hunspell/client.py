@@ -0,0 +1,216 @@
+import socket
+import threading
+
+from .document import DocumentSession
+from .hunspell import HunspellFilePathError
+from .protocol import (
+    OP_SPELL, OP_SUGGEST, OP_SUFFIX_SUGGEST, OP_STEM, OP_ANALYZE,
+    OP_BULK_SUGGEST, OP_BULK_SUFFIX_SUGGEST, OP_BULK_STEM, OP_BULK_ANALYZE,
+    OP_ADD, OP_REMOVE, OP_ADD_DIC, OP_SAVE_CACHE, OP_CLEAR_CACHE, OP_SET_CONCURRENCY,
+    OP_STATS, OP_BULK_ADD, OP_BULK_REMOVE, OP_LOAD_WORDLIST, OP_BULK_SPELL,
+    STATUS_OK, ProtocolError, recv_message, send_message)
+
+
+class RemoteUnicodeEncodeError(UnicodeEncodeError):
+    '''A UnicodeEncodeError raised by the server, which only sends back its message'''
+    def __init__(self, message):
+        UnicodeEncodeError.__init__(self, 'unknown', u'', 0, 0, message)
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+class RemoteUnicodeDecodeError(UnicodeDecodeError):
+    '''A UnicodeDecodeError raised by the server, which only sends back its message'''
+    def __init__(self, message):
+        UnicodeDecodeError.__init__(self, 'unknown', b'', 0, 0, message)
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+REMOTE_ERRORS = {
+    'HunspellFilePathError': HunspellFilePathError,
+    'ValueError': ValueError,
+    'UnicodeEncodeError': RemoteUnicodeEncodeError,
+    'UnicodeDecodeError': RemoteUnicodeDecodeError,
+    'TypeError': TypeError,
+    'MemoryError': MemoryError,
+    'OSError': OSError,
+    'PermissionError': PermissionError,
+}
+
+ACTION_OPCODES = {
+    'spell': OP_SPELL,
+    'suggest': OP_SUGGEST,
+    'suffix_suggest': OP_SUFFIX_SUGGEST,
+    'stem': OP_STEM,
+    'analyze': OP_ANALYZE,
+    'add': OP_ADD,
+    'remove': OP_REMOVE,
+}
+
+
+class HunspellClient(object):
+    '''
+    Drop-in stand in for Hunspell which forwards every call to a `python -m hunspell.serve`
+    process, so many worker processes can share one set of dictionaries and caches.
+    '''
+    def __init__(self, socket_path=None, host='127.0.0.1', port=None, timeout=None):
+        if not socket_path and port is None:
+            raise ValueError("Either a socket path or a port is required")
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.socket_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = self.socket_path
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            address = (self.host, self.port)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+        except:
+            sock.close()
+            raise
+        return sock
+
+    def _call(self, opcode, *args):
+        with self._lock:
+            if self._sock is None:
+                self._sock = self._connect()
+            try:
+                send_message(self._sock, opcode, args)
+                response = recv_message(self._sock)
+                if response is None:
+                    raise ProtocolError("Hunspell server closed the connection")
+            except:
+                # The stream is in an unknown state, start fresh on the next call
+                self._close_socket()
+                raise
+        status, value = response
+        if status == STATUS_OK:
+            return value
+        error_name, message = value
+        raise REMOTE_ERRORS.get(error_name, RuntimeError)(message)
+
+    def _close_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def close(self):
+        with self._lock:
+            self._close_socket()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self._close_socket()
+        except Exception:
+            pass
+
+    @property
+    def lang(self):
+        return self.stats()['lang']
+
+    @property
+    def max_threads(self):
+        return self.stats()['max_threads']
+
+    def stats(self):
+        '''Server side metrics: queue depth, batch sizes and request counts'''
+        return self._call(OP_STATS)
+
+    def add_dic(self, dpath, key=None):
+        # Note that the path is resolved on the server's filesystem, and has to be in one of
+        # the directories it was started with --allow-files-from for
+        return self._call(OP_ADD_DIC, dpath, key)
+
+    def add(self, word, example=None):
+        if example:
+            return self._call(OP_ADD, word, example)
+        return self._call(OP_ADD, word)
+
+    def add_with_affix(self, word, example):
+        return self.add(word, example)
+
+    def remove(self, word):
+        return self._call(OP_REMOVE, word)
+
+    def bulk_add(self, words, examples=None):
+        if examples is not None and not isinstance(examples, dict):
+            examples = tuple(examples)
+        return self._call(OP_BULK_ADD, tuple(words), examples)
+
+    def bulk_remove(self, words):
+        return self._call(OP_BULK_REMOVE, *words)
+
+    def load_wordlist(self, path):
+        # Same as add_dic the path must be allowed by the server, which reports the number of
+        # words and failures rather than a status per word
+        return self._call(OP_LOAD_WORDLIST, path)
+
+    def spell(self, word):
+        return self._call(OP_SPELL, word)
+
+    def analyze(self, word):
+        return self._call(OP_ANALYZE, word)
+
+    def stem(self, word):
+        return self._call(OP_STEM, word)
+
+    def suggest(self, word):
+        return self._call(OP_SUGGEST, word)
+
+    def suffix_suggest(self, word):
+        return self._call(OP_SUFFIX_SUGGEST, word)
+
+    def action(self, action, word):
+        if action not in ACTION_OPCODES:
+            raise ValueError("Unexpected action {} for hunspell".format(action))
+        return self._call(ACTION_OPCODES[action], word)
+
+    def bulk_spell(self, words):
+        return self._call(OP_BULK_SPELL, *words)
+
+    def bulk_suggest(self, words):
+        return self._call(OP_BULK_SUGGEST, *words)
+
+    def bulk_suffix_suggest(self, words):
+        return self._call(OP_BULK_SUFFIX_SUGGEST, *words)
+
+    def bulk_analyze(self, words):
+        return self._call(OP_BULK_ANALYZE, *words)
+
+    def bulk_stem(self, words):
+        return self._call(OP_BULK_STEM, *words)
+
+    def save_cache(self):
+        return self._call(OP_SAVE_CACHE)
+
+    def clear_cache(self):
+        return self._call(OP_CLEAR_CACHE)
+
+    def set_concurrency(self, max_threads):
+        return self._call(OP_SET_CONCURRENCY, max_threads)
+
+    def open_document(self, text, suggest=True):
+        # Session state stays local, only newly seen words are sent to the server
+        return DocumentSession(self, text, suggest)
@@ -0,0 +1,210 @@
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+# Letter runs, allowing inner apostrophes and hyphens (don't, makan-makan)
+TOKEN_PATTERN = u"[^\\W\\d_]+(?:[-'’][^\\W\\d_]+)*"
+# Fewer misspelled words than this are suggested one at a time rather than in bulk
+BULK_SUGGEST_THRESHOLD = 8
+# Text and tokens are kept in chunks of about this many characters
+CHUNK_SIZE = 4096
+
+Diagnostic = namedtuple('Diagnostic', ['start', 'end', 'word', 'suggestions'])
+DiagnosticChanges = namedtuple('DiagnosticChanges', ['added', 'removed'])
+
+
+class DocumentSession(object):
+    '''
+    Tracks the tokens of an edited document along with the spelling state of each distinct
+    word, so an edit only re-tokenizes the text around it and only asks Hunspell about
+    words the document didn't already contain.
+    '''
+    def __init__(self, hunspell, text=u'', suggest=True, token_pattern=TOKEN_PATTERN):
+        self.hunspell = hunspell
+        self.suggest = suggest
+        self._pattern = re.compile(token_pattern, re.UNICODE) if isinstance(token_pattern, str) else token_pattern
+        self._length = 0
+        self._n_tokens = 0
+        # Per chunk, ordered by position: its text, its offset in the document, and parallel
+        # lists of its tokens' positions (relative to the chunk) and words. An edit rewrites
+        # only the chunks around it and moves the offsets of later chunks.
+        self._chunk_texts = [u'']
+        self._chunk_offsets = [0]
+        self._chunk_starts = [[]]
+        self._chunk_ends = [[]]
+        self._chunk_words = [[]]
+        # Number of tokens per distinct word, and None (correct) or the suggestions per word
+        self._word_counts = {}
+        self._word_state = {}
+        self.apply_edit(0, 0, text)
+
+    def __len__(self):
+        return self._n_tokens
+
+    @property
+    def text(self):
+        return u''.join(self._chunk_texts)
+
+    def diagnostics(self):
+        '''All misspelled tokens of the current text'''
+        diagnostics = []
+        for c, offset in enumerate(self._chunk_offsets):
+            for start, end, word in zip(self._chunk_starts[c], self._chunk_ends[c], self._chunk_words[c]):
+                suggestions = self._word_state[word]
+                if suggestions is not None:
+                    diagnostics.append(Diagnostic(offset + start, offset + end, word, suggestions))
+        return diagnostics
+
+    def apply_edit(self, start, end, new_text):
+        '''Replaces text[start:end] with new_text, returning the diagnostics that appeared
+        (in new positions) and disappeared (in old positions). Diagnostics which only moved
+        with the edit are not reported.'''
+        if not 0 <= start <= end <= self._length:
+            raise ValueError("Edit range {}:{} is outside the document".format(start, end))
+        delta = len(new_text) - (end - start)
+
+        # The affected chunks are edited as one piece, in positions relative to it
+        c0, c1 = self._edited_chunks(start, end, delta)
+        base = self._chunk_offsets[c0]
+        start -= base
+        end -= base
+        text = u''.join(self._chunk_texts[c0:c1 + 1])
+        starts = []
+        ends = []
+        words = []
+        for c in range(c0, c1 + 1):
+            shift = self._chunk_offsets[c] - base
+            starts.extend([position + shift for position in self._chunk_starts[c]])
+            ends.extend([position + shift for position in self._chunk_ends[c]])
+            words.extend(self._chunk_words[c])
+
+        # Tokens touching the edit, plus a neighbor either side as punctuation between them
+        # can join or split words
+        first = max(0, bisect_left(ends, start) - 1)
+        last = min(len(words), bisect_right(starts, end) + 1)
+        region_start = start
+        region_end = end
+        if first < last:
+            region_start = min(start, starts[first])
+            region_end = max(end, ends[last - 1])
+
+        old_diagnostics = set()
+        for i in range(first, last):
+            suggestions = self._word_state[words[i]]
+            if suggestions is not None:
+                # Old positions as they would be if the token was merely moved by the edit
+                shift = base + (delta if starts[i] >= end else 0)
+                old_diagnostics.add((
+                    Diagnostic(starts[i] + shift, ends[i] + shift, words[i], suggestions),
+                    Diagnostic(starts[i] + base, ends[i] + base, words[i], suggestions)))
+
+        text = text[:start] + new_text + text[end:]
+        tokens = [(match.start(), match.end(), match.group())
+            for match in self._pattern.finditer(text, region_start, region_end + delta)]
+
+        # Queried before any state changes, so an edit which fails leaves the session as it was
+        new_words = set(word for _, _, word in tokens if word not in self._word_state)
+        self._word_state.update(self._check(new_words))
+        for word in words[first:last]:
+            self._word_counts[word] -= 1
+        for _, _, word in tokens:
+            self._word_counts[word] = self._word_counts.get(word, 0) + 1
+        for word in set(words[first:last]):
+            if self._word_counts[word] == 0:
+                del self._word_counts[word]
+                del self._word_state[word]
+
+        self._length += delta
+        self._n_tokens += len(tokens) - (last - first)
+        starts[first:last] = [token[0] for token in tokens]
+        ends[first:last] = [token[1] for token in tokens]
+        words[first:last] = [token[2] for token in tokens]
+        tail = first + len(tokens)
+        if delta:
+            starts[tail:] = [position + delta for position in starts[tail:]]
+            ends[tail:] = [position + delta for position in ends[tail:]]
+        following = c0 + self._replace_chunks(c0, c1, base, text, starts, ends, words)
+        if delta:
+            self._chunk_offsets[following:] = [offset + delta for offset in self._chunk_offsets[following:]]
+
+        new_diagnostics = set()
+        for position_start, position_end, word in tokens:
+            suggestions = self._word_state[word]
+            if suggestions is not None:
+                new_diagnostics.add(Diagnostic(position_start + base, position_end + base, word, suggestions))
+        moved = set(shifted for shifted, _ in old_diagnostics)
+        return DiagnosticChanges(
+            added=sorted(new_diagnostics - moved),
+            removed=sorted(original for shifted, original in old_diagnostics if shifted not in new_diagnostics))
+
+    def _edited_chunks(self, start, end, delta):
+        '''First and last chunk an edit of text[start:end] needs, covering the tokens either side
+        of it'''
+        offsets = self._chunk_offsets
+        c0 = bisect_right(offsets, start) - 1
+        c1 = bisect_right(offsets, end) - 1
+        while c0 > 0 and not (self._chunk_ends[c0] and self._chunk_ends[c0][0] < start - offsets[c0]):
+            c0 -= 1
+        while c1 < len(offsets) - 1 and not (
+                self._chunk_starts[c1] and self._chunk_starts[c1][-1] > end - offsets[c1]):
+            c1 += 1
+        # Chunks shrunk by deletions are merged into the next one
+        while c1 < len(offsets) - 1 and offsets[c1 + 1] - offsets[c0] + delta < CHUNK_SIZE // 2:
+            c1 += 1
+        return c0, c1
+
+    def _replace_chunks(self, c0, c1, base, text, starts, ends, words):
+        '''Replaces chunks c0 to c1 with the given piece of text at base and its tokens, cut
+        between tokens into chunks of about CHUNK_SIZE. Returns the number of new chunks.'''
+        # Text position and token index each new chunk starts at
+        bounds = [(0, 0)]
+        for i, position in enumerate(starts):
+            if position - bounds[-1][0] >= CHUNK_SIZE:
+                bounds.append((position, i))
+        bounds.append((len(text), len(starts)))
+        pieces = range(len(bounds) - 1)
+        self._chunk_texts[c0:c1 + 1] = [text[bounds[p][0]:bounds[p + 1][0]] for p in pieces]
+        self._chunk_offsets[c0:c1 + 1] = [base + bounds[p][0] for p in pieces]
+        self._chunk_starts[c0:c1 + 1] = [[position - bounds[p][0] for position in starts[bounds[p][1]:bounds[p + 1][1]]]
+            for p in pieces]
+        self._chunk_ends[c0:c1 + 1] = [[position - bounds[p][0] for position in ends[bounds[p][1]:bounds[p + 1][1]]]
+            for p in pieces]
+        self._chunk_words[c0:c1 + 1] = [words[bounds[p][1]:bounds[p + 1][1]] for p in pieces]
+        return len(bounds) - 1
+
+    def recheck(self):
+        '''Re-queries every word, e.g. after words were added to or removed from the dictionary'''
+        self._word_state = self._check(self._word_counts)
+        return self.diagnostics()
+
+    def _check(self, words):
+        '''Returns None (correct) or the suggestions per word'''
+        words = list(words)
+        if not words:
+            return {}
+        spelled = self._query('spell', words, bulk=True)
+        # Words the dictionary can't encode are misspelled without suggestions
+        misspelled = [word for word in words if spelled[word] is False]
+        suggestions = {}
+        if self.suggest and misspelled:
+            # Cached words are answered directly, the rest go to the threaded bulk engine
+            suggestions = self._query('suggest', misspelled, bulk=len(misspelled) >= BULK_SUGGEST_THRESHOLD)
+        return dict((word, None if spelled[word] else tuple(suggestions.get(word) or ()))
+            for word in words)
+
+    def _query(self, action, words, bulk):
+        '''Answers an action for words, with None for words the dictionary can't encode'''
+        hunspell = self.hunspell
+        if bulk and hasattr(hunspell, 'bulk_' + action):
+            try:
+                return getattr(hunspell, 'bulk_' + action)(words)
+            except UnicodeEncodeError:
+                # One such word fails the whole request, so they are asked one at a time
+                pass
+        results = {}
+        for word in words:
+            try:
+                results[word] = getattr(hunspell, action)(word)
+            except UnicodeEncodeError:
+                results[word] = None
+        return results
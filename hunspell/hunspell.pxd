@@ -14,7 +14,8 @@ cdef extern from "hunspell/hunspell.hxx":
         #     SPELL_FORBIDDEN = an explicit forbidden word
         #   root: root (stem), when input is a word with affix(es)
 
-        bint spell(const char * word, int * info = NULL, char ** root = NULL) nogil
+        bint spell(const char * word) nogil
+        bint spell(const char * word, int * info, char ** root) nogil
 
         # suggest(suggestions, word) - search suggestions
         # input: pointer to an array of strings pointer and the (bad) word
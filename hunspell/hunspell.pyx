@@ -1,13 +1,19 @@
 import os
+import time
+import threading
 import hashlib
 from .platform import detect_cpus
+from .sharedcache import SharedMemoryCache
+from .document import DocumentSession
 from cacheman.cachewrap import NonPersistentCache
 from cacheman.cacher import get_cache_manager
 from cacheman.autosync import TimeCount, AutoSyncCache
+from cacheman.registers import generate_pickle_path
 from locale import getpreferredencoding
 
 from libc.stdlib cimport *
 from libc.string cimport *
+from libc.stdio cimport FILE, fopen, fclose, fread, fseek, ftell, SEEK_END, SEEK_SET
 from cython.operator cimport dereference as deref
 
 # Use full path for cimport ONLY!
@@ -17,6 +23,7 @@ class HunspellFilePathError(IOError):
     pass
 
 WIN32_LONG_PATH_PREFIX = "\\\\?\\"
+DEFAULT_SHARED_CACHE_SIZE = 64 * 1024 * 1024
 
 ctypedef enum action_type:
     add,
@@ -96,6 +103,113 @@ cdef unicode c_string_to_unicode_no_except(char* s, basestring encoding):
     except UnicodeDecodeError:
         return u""
 
+cdef int hspell_add_dic(Hunspell *hspell, basestring dpath, basestring key) except? -1:
+    # C-realm load extra dictionary into a Hunspell instance
+    cdef char *c_path = NULL
+    cdef char *c_key = NULL
+    copy_to_c_string(dpath, &c_path, 'UTF-8')
+    try:
+        if key:
+            copy_to_c_string(key, &c_key, 'UTF-8')
+        return hspell.add_dic(c_path, c_key)
+    finally:
+        if c_key is not NULL:
+            free(c_key)
+        if c_path is not NULL:
+            free(c_path)
+
+def retrieve_cache(manager, basestring cache_name, basestring disk_cache_dir=None,
+        basestring shared_cache_dir=None, shared_cache_size=None):
+    # Registers the named cache on first use, persisting it when a disk cache is configured
+    if shared_cache_dir:
+        # Shared between every process on the host using the same cache name
+        return SharedMemoryCache(os.path.join(shared_cache_dir, cache_name + '.cache'),
+            size=shared_cache_size or DEFAULT_SHARED_CACHE_SIZE)
+    if not manager.cache_registered(cache_name):
+        if disk_cache_dir:
+            custom_time_checks = [TimeCount(60, 1000000), TimeCount(300, 10000), TimeCount(900, 1)]
+            AutoSyncCache(cache_name, cache_manager=manager, time_checks=custom_time_checks)
+        else:
+            NonPersistentCache(cache_name, cache_manager=manager)
+    return manager.retrieve_cache(cache_name)
+
+def merge_suggestions(suggestion_lists):
+    # Interleaves ranked suggestion lists by rank, earlier lists winning ties, dropping duplicates
+    cdef list merged = []
+    cdef set seen = set()
+    cdef int rank
+    cdef int max_len = max([len(suggestions) for suggestions in suggestion_lists] or [0])
+    for rank from 0 <= rank < max_len:
+        for suggestions in suggestion_lists:
+            if rank < len(suggestions) and suggestions[rank] not in seen:
+                seen.add(suggestions[rank])
+                merged.append(suggestions[rank])
+    return tuple(merged)
+
+class IndexedCache(dict):
+    '''
+    In-memory result cache which indexes every entry under the words its result depends on:
+    the words it names, the stems of an analysis, or None when it names no known word. A
+    wrapper moves its results into these once its dictionary is changed at runtime, so each
+    change drops just the affected entries without scanning, and results which no longer
+    hold for the dictionary files stay out of caches other wrappers read. With disk caching
+    the results are saved under a name of the dictionary's changes.
+    '''
+    def __init__(self, entries=(), analyses=False):
+        dict.__init__(self)
+        self.analyses = analyses
+        self.manager = None
+        self.name = None
+        self._keys_by_word = {}
+        for key, value in entries:
+            self[key] = value
+
+    def _dependencies(self, key, value):
+        if value is True or value is False:
+            return (key,) if value else (None,)
+        if isinstance(value, basestring):
+            # Root of a word accepted through its affixes
+            return (value,)
+        if not value:
+            return (None,)
+        if self.analyses:
+            stems = [field[3:] for item in value for field in item.split() if field.startswith('st:')]
+            return stems or (key,)
+        return value
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        for word in self._dependencies(key, value):
+            self._keys_by_word.setdefault(word, set()).add(key)
+
+    def drop_dependents(self, word):
+        '''Drops every entry whose result depends on word, None for results naming no word'''
+        for key in self._keys_by_word.pop(word, ()):
+            self.pop(key, None)
+
+    def clear(self):
+        dict.clear(self)
+        self._keys_by_word.clear()
+
+    def persist_as(self, manager, basestring name):
+        '''Saves the results under name from now on, merging in any an earlier run saved there'''
+        self.manager = manager
+        self.name = name
+        # Only looked up when saved, as registering a cache writes it out
+        if os.path.exists(generate_pickle_path(manager.cache_directory, name)):
+            for key, value in retrieve_cache(manager, name, manager.cache_directory).items():
+                if key not in self:
+                    self[key] = value
+
+    def save(self):
+        if self.manager is None:
+            # Nothing to persist without a disk cache
+            return
+        saved = retrieve_cache(self.manager, self.name, self.manager.cache_directory)
+        saved.clear()
+        saved.update(self)
+        saved.save()
+
 #//////////////////////////////////////////////////////////////////////////////
 # Thread Worker
 #//////////////////////////////////////////////////////////////////////////////
@@ -132,9 +246,290 @@ cdef void *hunspell_worker(void *argument) nogil:
             args.output_counts[i] = args.hspell.suggest(args.output_array_ptr + i, deref(args.word_list + i))
         elif args.action_e == suffix_suggest:
             args.output_counts[i] = args.hspell.suffix_suggest(args.output_array_ptr + i, deref(args.word_list + i))
+        elif args.action_e == spell:
+            # No output list, the count holds whether the word is correct
+            args.output_counts[i] = args.hspell.spell(deref(args.word_list + i))
+
+    return NULL
+
+cdef struct MultiThreadWorkerArgs:
+    # Structure for defining multi dictionary worker args
+
+    # Thread ID
+    int tid
+    # Array (of length n_dicts) of Hunspell Dictionaries, checked in order
+    Hunspell **hspells
+    int n_dicts
+    # Index of the first word this thread will check and the number of words to check
+    int offset
+    int n_words
+    # Number of words across all threads, the stride between dictionaries in the arrays below
+    int total_words
+    # Array (of length n_dicts * total_words) of C strings holding each word in each
+    # dictionary's encoding, NULL when the word can't be encoded for that dictionary
+    char **word_lists
+    # Array (of length n_dicts * total_words) of arrays of C strings
+    char ***output_array_ptr
+    # Array (of length n_dicts * total_words) of integers, each the length of the corresponding C string array
+    int *output_counts
+    # Array (of length total_words) with the index of the first dictionary accepting each word, -1 if none do
+    int *accepted_by
+    # Array (of length total_words) receiving the root Hunspell accepted each word through, if any
+    char **roots
+    # Determines if the thread is only spell checking or also collecting suggestions
+    action_type action_e
+
+cdef void *multi_hunspell_worker(void *argument) nogil:
+    cdef MultiThreadWorkerArgs args
+    cdef int i, d, idx
+    cdef char *root
+    args = deref(<MultiThreadWorkerArgs *>argument)
+
+    for i from args.offset <= i < args.offset + args.n_words:
+        args.accepted_by[i] = -1
+        for d from 0 <= d < args.n_dicts:
+            idx = d * args.total_words + i
+            if args.word_lists[idx] is NULL:
+                continue
+            root = NULL
+            if args.hspells[d].spell(args.word_lists[idx], NULL, &root):
+                # No need to check the remaining dictionaries
+                args.accepted_by[i] = d
+                args.roots[i] = root
+                break
+            if root is not NULL:
+                free(root)
+
+        if args.action_e == suggest and args.accepted_by[i] == -1:
+            for d from 0 <= d < args.n_dicts:
+                idx = d * args.total_words + i
+                if args.word_lists[idx] is not NULL:
+                    args.output_counts[idx] = args.hspells[d].suggest(args.output_array_ptr + idx, args.word_lists[idx])
 
     return NULL
 
+cdef struct MutationWorkerArgs:
+    # Structure for defining dictionary mutation worker args
+
+    # Pointer to the Hunspell Dictionary being modified
+    Hunspell *hspell
+    # Number of words to apply
+    int n_words
+    # Array of C strings, length of Array is n_words (NULL entries are skipped)
+    char **word_list
+    # Array of C strings holding the affix example for each word (NULL for a plain add)
+    char **example_list
+    # Array of flags, non-zero to remove the word instead of adding it
+    char *removals
+    # Array (of length n_words) receiving each Hunspell return code, NULL to discard them
+    int *statuses
+
+cdef void *mutation_worker(void *argument) nogil:
+    cdef MutationWorkerArgs args
+    cdef int i, rc
+    args = deref(<MutationWorkerArgs *>argument)
+
+    for i from 0 <= i < args.n_words:
+        if args.word_list[i] is NULL:
+            continue
+        if args.removals[i]:
+            rc = args.hspell.remove(args.word_list[i])
+        elif args.example_list[i] is not NULL:
+            rc = args.hspell.add_with_affix(args.word_list[i], args.example_list[i])
+        else:
+            rc = args.hspell.add(args.word_list[i])
+        if args.statuses is not NULL:
+            args.statuses[i] = rc
+
+    return NULL
+
+cdef int parse_wordlist(char *buffer, size_t size, char **words, char **examples, char *removals, int capacity) nogil:
+    # Splits a NUL terminated buffer in place into personal dictionary entries:
+    # 'word', 'word/example' (add with the affixes of example) or '*word' (remove)
+    cdef size_t pos = 0, start, end
+    cdef int n = 0
+    cdef char *line
+    cdef char *slash
+    while pos < size and n < capacity:
+        start = pos
+        while pos < size and buffer[pos] != c'\n':
+            pos += 1
+        end = pos
+        buffer[end] = 0
+        pos += 1
+        if end > start and buffer[end - 1] == c'\r':
+            end -= 1
+            buffer[end] = 0
+        line = buffer + start
+        removals[n] = 0
+        examples[n] = NULL
+        if line[0] == c'*':
+            removals[n] = 1
+            line += 1
+        else:
+            slash = strchr(line, c'/')
+            if slash is not NULL:
+                slash[0] = 0
+                if slash[1] != 0:
+                    examples[n] = slash + 1
+        if line[0] == 0:
+            continue
+        words[n] = line
+        n += 1
+    return n
+
+cdef class MutationBatch(object):
+    # Words (and affix examples) encoded for a dictionary in one native buffer, ready to
+    # be applied to any number of Hunspell instances without touching Python objects
+    cdef char *buffer
+    cdef char **words
+    cdef char **examples
+    cdef char *removals
+    cdef int n_words
+
+    def __dealloc__(self):
+        if self.buffer is not NULL:
+            free(self.buffer)
+        if self.words is not NULL:
+            free(self.words)
+        if self.examples is not NULL:
+            free(self.examples)
+        if self.removals is not NULL:
+            free(self.removals)
+
+    cdef int _allocate(self, int n_words, size_t buffer_size) except -1:
+        self.n_words = n_words
+        self.buffer = <char *>malloc(buffer_size + 1)
+        self.words = <char **>calloc(n_words + 1, sizeof(char *))
+        self.examples = <char **>calloc(n_words + 1, sizeof(char *))
+        self.removals = <char *>calloc(n_words + 1, sizeof(char))
+        if self.buffer is NULL or self.words is NULL or self.examples is NULL or self.removals is NULL:
+            raise MemoryError()
+        self.buffer[buffer_size] = 0
+        return 0
+
+    def update_digest(self, digest):
+        cdef int i
+        for i from 0 <= i < self.n_words:
+            digest.update(b'-' if self.removals[i] else b'+')
+            if self.words[i] is not NULL:
+                digest.update(<bytes>self.words[i])
+            digest.update(b'\0')
+            if self.examples[i] is not NULL:
+                digest.update(<bytes>self.examples[i])
+            digest.update(b'\n')
+
+    cdef bint has_examples(self):
+        cdef int i
+        for i from 0 <= i < self.n_words:
+            if self.examples[i] is not NULL:
+                return True
+        return False
+
+    cdef list decoded_words(self, basestring encoding):
+        cdef list decoded = []
+        cdef int i
+        for i from 0 <= i < self.n_words:
+            decoded.append(c_string_to_unicode_no_except(self.words[i], encoding))
+        return decoded
+
+cdef bytes encode_or_none(py_string, basestring encoding):
+    if py_string is None:
+        return None
+    if isinstance(py_string, bytes):
+        return py_string
+    try:
+        return py_string.encode(encoding, 'strict')
+    except UnicodeEncodeError:
+        return None
+
+cdef MutationBatch batch_from_words(list words, examples, bint removal, basestring encoding):
+    '''Encodes python words into a batch, words that can't be encoded are left NULL'''
+    cdef MutationBatch batch = MutationBatch()
+    cdef int n_words = len(words)
+    cdef int i
+    cdef size_t offset = 0
+    cdef list encoded = []
+    cdef bytes c_word, c_example
+    cdef size_t buffer_size = 0
+
+    for i from 0 <= i < n_words:
+        example = None
+        if examples is not None:
+            example = examples.get(words[i]) if isinstance(examples, dict) else examples[i]
+        c_word = encode_or_none(words[i], encoding)
+        c_example = encode_or_none(example, encoding) if example else None
+        if example and c_example is None:
+            # Can't honor the example so don't add the word at all
+            c_word = None
+        encoded.append((c_word, c_example))
+        if c_word is not None:
+            buffer_size += len(c_word) + 1
+        if c_example is not None:
+            buffer_size += len(c_example) + 1
+
+    batch._allocate(n_words, buffer_size)
+    for i from 0 <= i < n_words:
+        c_word, c_example = encoded[i]
+        batch.removals[i] = removal
+        if c_word is not None:
+            memcpy(batch.buffer + offset, <char *>c_word, len(c_word))
+            batch.buffer[offset + len(c_word)] = 0
+            batch.words[i] = batch.buffer + offset
+            offset += len(c_word) + 1
+        if c_example is not None:
+            memcpy(batch.buffer + offset, <char *>c_example, len(c_example))
+            batch.buffer[offset + len(c_example)] = 0
+            batch.examples[i] = batch.buffer + offset
+            offset += len(c_example) + 1
+    return batch
+
+cdef MutationBatch batch_from_file(bytes c_path):
+    '''Reads a personal dictionary style wordlist without creating python objects per word'''
+    cdef MutationBatch batch = MutationBatch()
+    cdef char *path = c_path
+    cdef FILE *handle = NULL
+    cdef long file_size = -1
+    cdef size_t size, read_size, i
+    cdef int capacity = 1
+    cdef bint failed = False
+
+    with nogil:
+        handle = fopen(path, "rb")
+        if handle is NULL:
+            failed = True
+        else:
+            fseek(handle, 0, SEEK_END)
+            file_size = ftell(handle)
+            fseek(handle, 0, SEEK_SET)
+    if failed or file_size < 0:
+        if handle is not NULL:
+            fclose(handle)
+        raise HunspellFilePathError("File '{}' not found or accessible".format(c_path))
+
+    size = <size_t>file_size
+    try:
+        batch.buffer = <char *>malloc(size + 1)
+        if batch.buffer is NULL:
+            raise MemoryError()
+        with nogil:
+            read_size = fread(batch.buffer, 1, size, handle)
+            batch.buffer[read_size] = 0
+            for i from 0 <= i < read_size:
+                if batch.buffer[i] == c'\n':
+                    capacity += 1
+    finally:
+        fclose(handle)
+
+    batch.words = <char **>calloc(capacity, sizeof(char *))
+    batch.examples = <char **>calloc(capacity, sizeof(char *))
+    batch.removals = <char *>calloc(capacity, sizeof(char))
+    if batch.words is NULL or batch.examples is NULL or batch.removals is NULL:
+        raise MemoryError()
+    with nogil:
+        batch.n_words = parse_wordlist(batch.buffer, read_size, batch.words, batch.examples, batch.removals, capacity)
+    return batch
+
 #//////////////////////////////////////////////////////////////////////////////
 cdef class HunspellWrap(object):
     # C-realm properties
@@ -151,6 +546,20 @@ cdef class HunspellWrap(object):
     cdef public object _stem_cache
     cdef char *affpath
     cdef char *dpath
+    # One Hunspell instance per bulk worker thread, kept in sync with every mutation
+    cdef Hunspell **_thread_hspells
+    cdef int _n_thread_hspells
+    # Extra dictionaries and word batches to replay onto newly created thread instances
+    cdef list _mutation_log
+    # Digest of every entry in the mutation log, keeping a changed dictionary's shared results apart
+    cdef object _changes_digest
+    cdef public basestring _disk_cache_dir
+    cdef public basestring _shared_cache_dir
+    cdef public object _shared_cache_size
+    # Held while the thread instances are in use, as their workers run without the gil
+    cdef public object _pool_lock
+    # Held while the main instance is in use, as mutations run without the gil
+    cdef public object _main_lock
 
     cdef basestring prefix_win_utf8_hunspell_path(self, basestring path):
         if os.name == 'nt' and self._system_encoding.lower().replace('-', '') == 'utf8':
@@ -200,7 +609,8 @@ cdef class HunspellWrap(object):
 
     def __init__(self, basestring lang='en_US', basestring cache_manager="hunspell",
             basestring disk_cache_dir=None, basestring hunspell_data_dir=None,
-            basestring system_encoding=None):
+            basestring system_encoding=None, basestring shared_cache_dir=None,
+            shared_cache_size=None):
         # TODO - make these LRU caches so that you don't destroy your memory!
         if hunspell_data_dir is None:
             hunspell_data_dir = os.environ.get("HUNSPELL_DATA")
@@ -210,64 +620,55 @@ cdef class HunspellWrap(object):
             system_encoding = os.environ.get("HUNSPELL_PATH_ENCODING")
         if system_encoding is None:
             system_encoding = getpreferredencoding()
+        if shared_cache_dir is None:
+            shared_cache_dir = os.environ.get("HUNSPELL_SHARED_CACHE")
         self._hunspell_dir = os.path.abspath(hunspell_data_dir)
         self._system_encoding = system_encoding
 
         self.lang = lang
+        self._mutation_log = []
+        self._changes_digest = hashlib.md5()
+        self._pool_lock = threading.Lock()
+        self._main_lock = threading.Lock()
         self._cxx_hunspell = self._create_hspell_inst(lang)
         # csutil.hxx defines the encoding for this value as #define SPELL_ENCODING "ISO8859-1"
         self._dic_encoding = valid_encoding(c_string_to_unicode_no_except(self._cxx_hunspell.get_dic_encoding(), 'ISO8859-1'))
         self.max_threads = detect_cpus()
 
         self._cache_manager_name = cache_manager
+        self._disk_cache_dir = disk_cache_dir
+        self._shared_cache_dir = shared_cache_dir
+        self._shared_cache_size = shared_cache_size
+        self._bind_caches()
+
+    def _bind_caches(self):
         manager = get_cache_manager(self._cache_manager_name)
-        if disk_cache_dir:
-            manager.cache_directory = disk_cache_dir
-
-        suggest_cache_name = "hunspell_suggest_{lang}_{hash}".format(
-            lang=lang, hash=md5(self._hunspell_dir))
-        suffix_cache_name = "hunspell_suffix_{lang}_{hash}".format(
-            lang=lang, hash=md5(self._hunspell_dir))
-        analyze_cache_name = "hunspell_analyze_{lang}_{hash}".format(
-            lang=lang, hash=md5(self._hunspell_dir))
-        stem_cache_name = "hunspell_stem_{lang}_{hash}".format(
-            lang=lang, hash=md5(self._hunspell_dir))
-
-        if not manager.cache_registered(suggest_cache_name):
-            if disk_cache_dir:
-                custom_time_checks = [TimeCount(60, 1000000), TimeCount(300, 10000), TimeCount(900, 1)]
-                AutoSyncCache(suggest_cache_name, cache_manager=manager, time_checks=custom_time_checks)
-            else:
-                NonPersistentCache(suggest_cache_name, cache_manager=manager)
+        if self._disk_cache_dir:
+            manager.cache_directory = self._disk_cache_dir
 
-        if not manager.cache_registered(suffix_cache_name):
-            if disk_cache_dir:
-                custom_time_checks = [TimeCount(60, 1000000), TimeCount(300, 10000), TimeCount(900, 1)]
-                AutoSyncCache(suffix_cache_name, cache_manager=manager, time_checks=custom_time_checks)
-            else:
-                NonPersistentCache(suffix_cache_name, cache_manager=manager)
+        self._suggest_cache = retrieve_cache(manager, self._cache_name('suggest'), self._disk_cache_dir,
+            self._shared_cache_dir, self._shared_cache_size)
+        self._suffix_cache = retrieve_cache(manager, self._cache_name('suffix'), self._disk_cache_dir,
+            self._shared_cache_dir, self._shared_cache_size)
+        self._analyze_cache = retrieve_cache(manager, self._cache_name('analyze'), self._disk_cache_dir,
+            self._shared_cache_dir, self._shared_cache_size)
+        self._stem_cache = retrieve_cache(manager, self._cache_name('stem'), self._disk_cache_dir,
+            self._shared_cache_dir, self._shared_cache_size)
 
-        if not manager.cache_registered(analyze_cache_name):
-            if disk_cache_dir:
-                custom_time_checks = [TimeCount(60, 1000000), TimeCount(300, 10000), TimeCount(900, 1)]
-                AutoSyncCache(analyze_cache_name, cache_manager=manager, time_checks=custom_time_checks)
-            else:
-                NonPersistentCache(analyze_cache_name, cache_manager=manager)
+    def _cache_name(self, basestring kind):
+        return "hunspell_{kind}_{lang}_{hash}".format(kind=kind, lang=self.lang, hash=md5(self._hunspell_dir))
 
-        if not manager.cache_registered(stem_cache_name):
-            if disk_cache_dir:
-                custom_time_checks = [TimeCount(60, 1000000), TimeCount(300, 10000), TimeCount(900, 1)]
-                AutoSyncCache(stem_cache_name, cache_manager=manager, time_checks=custom_time_checks)
-            else:
-                NonPersistentCache(stem_cache_name, cache_manager=manager)
-
-        self._suggest_cache = manager.retrieve_cache(suggest_cache_name)
-        self._suffix_cache = manager.retrieve_cache(suffix_cache_name)
-        self._analyze_cache = manager.retrieve_cache(analyze_cache_name)
-        self._stem_cache = manager.retrieve_cache(stem_cache_name)
+    def changes_fingerprint(self):
+        '''Identifies the runtime changes made to the dictionary, empty when there are none'''
+        return self._changes_digest.hexdigest() if self._mutation_log else ''
 
     def __dealloc__(self):
+        cdef int i
         del self._cxx_hunspell
+        if self._thread_hspells is not NULL:
+            for i from 0 <= i < self._n_thread_hspells:
+                del self._thread_hspells[i]
+            free(self._thread_hspells)
         if self.affpath is not NULL:
             free(self.affpath)
         if self.dpath is not NULL:
@@ -287,59 +688,75 @@ cdef class HunspellWrap(object):
 
     def add_dic(self, basestring dpath, basestring key=None):
         # Python load extra dictionaries
-        cdef char *c_path = NULL
-        cdef char *c_key = NULL
-        copy_to_c_string(dpath, &c_path, 'UTF-8')
-        try:
-            if key:
-                copy_to_c_string(key, &c_key, 'UTF-8')
-            try:
-                return self._cxx_hunspell.add_dic(c_path, c_key)
-            finally:
-                if c_key is not NULL:
-                    free(c_key)
-        finally:
-            if c_path is not NULL:
-                free(c_path)
+        cdef int i
+        with self._pool_lock:
+            for i from 0 <= i < self._n_thread_hspells:
+                if self._thread_hspells[i] is not NULL:
+                    hspell_add_dic(self._thread_hspells[i], dpath, key)
+            self._mutation_log.append((dpath, key))
+            self._changes_digest.update(u'dic\0{}\0{}\n'.format(dpath, key or '').encode('utf-8', 'surrogatepass'))
+        with self._main_lock:
+            result = hspell_add_dic(self._cxx_hunspell, dpath, key)
+        # Like adding every word of the file along with its affixes
+        self._invalidate_cached_words(None, [], True)
+        return result
 
     def add(self, basestring word, basestring example=None):
         # Python add individual word to dictionary
-        cdef char *c_word = NULL
-        cdef char *c_example = NULL
-        copy_to_c_string(word, &c_word, self._dic_encoding)
-        try:
-            if example:
-                copy_to_c_string(example, &c_example, self._dic_encoding)
-                try:
-                    return self._cxx_hunspell.add_with_affix(c_word, c_example)
-                finally:
-                    if c_example is not NULL:
-                        free(c_example)
-            else:
-                return self._cxx_hunspell.add(c_word)
-        finally:
-            if c_word is not NULL:
-                free(c_word)
+        self.check_encodable(word)
+        if example:
+            self.check_encodable(example)
+        return self.c_mutate([word], [example] if example else None, False, False)['status'][0]
 
     def add_with_affix(self, basestring word, basestring example):
         return self.add(word, example)
 
     def remove(self, basestring word):
         # Python remove individual word from dictionary
-        cdef char *c_word = NULL
-        copy_to_c_string(word, &c_word, self._dic_encoding)
+        self.check_encodable(word)
+        return self.c_mutate([word], None, True, False)['status'][0]
+
+    def bulk_add(self, words, examples=None):
+        '''Adds many words at once, optionally with affix examples given as a list parallel
+        # to words or a dict of word to example. Returns Hunspell status codes in the order of
+        # words (0 is success, -1 means the word couldn't be encoded) and timings'''
+        return self.c_mutate(list(words), examples, False, True)
+
+    def bulk_remove(self, words):
+        return self.c_mutate(list(words), None, True, True)
+
+    def load_wordlist(self, basestring path):
+        '''Applies a personal dictionary style file, read natively and assumed to be in the
+        # dictionary's encoding: one 'word', 'word/example' or '*word' (remove) per line. The
+        # report lists the decoded words alongside their status codes'''
+        return self.c_load_wordlist(path)[0]
+
+    cdef tuple c_load_wordlist(self, basestring path):
+        # Returns the report along with the words added and removed, and whether any had affixes
+        cdef MutationBatch batch
+        start = time.time()
         try:
-            return self._cxx_hunspell.remove(c_word)
-        finally:
-            if c_word is not NULL:
-                free(c_word)
+            c_path = path.encode(self._system_encoding, 'strict')
+        except UnicodeEncodeError as e:
+            raise HunspellFilePathError(
+                "File path ('{path}') encoding did not match locale encoding ('{enc}'): {err}".format(
+                    path=path, enc=self._system_encoding, err=str(e))
+            )
+        batch = batch_from_file(c_path)
+        words = batch.decoded_words(self._dic_encoding)
+        removed = [words[i] for i in range(batch.n_words) if batch.removals[i]]
+        added = [words[i] for i in range(batch.n_words) if not batch.removals[i]]
+        report = self._apply_and_report(batch, words, removed, time.time() - start)
+        report['words'] = words
+        return report, added, removed, batch.has_examples()
 
     def spell(self, basestring word):
         # Python individual word spellcheck
         cdef char *c_word = NULL
         copy_to_c_string(word, &c_word, self._dic_encoding)
         try:
-            return self._cxx_hunspell.spell(c_word) != 0
+            with self._main_lock:
+                return self._cxx_hunspell.spell(c_word) != 0
         finally:
             if c_word is not NULL:
                 free(c_word)
@@ -371,6 +788,9 @@ cdef class HunspellWrap(object):
         else:
             return self.c_tuple_action(action_e, word)
 
+    def bulk_spell(self, words):
+        return self.c_bulk_spell(words)
+
     def bulk_suggest(self, words):
         return self.c_bulk_action(suggest, words)
 
@@ -398,6 +818,10 @@ cdef class HunspellWrap(object):
     def set_concurrency(self, max_threads):
         self.max_threads = max_threads
 
+    def open_document(self, text, suggest=True):
+        '''Returns a DocumentSession which re-checks only the edited parts of text'''
+        return DocumentSession(self, text, suggest)
+
     ###################
     # C-Operations
     ###################
@@ -415,16 +839,17 @@ cdef class HunspellWrap(object):
         copy_to_c_string(word, &c_word, self._dic_encoding)
 
         try:
-            if action_e == stem:
-                count = self._cxx_hunspell.stem(&s_list, c_word)
-            elif action_e == analyze:
-                count = self._cxx_hunspell.analyze(&s_list, c_word)
-            elif action_e == suggest:
-                count = self._cxx_hunspell.suggest(&s_list, c_word)
-            elif action_e == suffix_suggest:
-                count = self._cxx_hunspell.suffix_suggest(&s_list, c_word)
-            else:
-                raise ValueError("Unexpected tuple action {} for hunspell".format(action_to_string(action_e)))
+            with self._main_lock:
+                if action_e == stem:
+                    count = self._cxx_hunspell.stem(&s_list, c_word)
+                elif action_e == analyze:
+                    count = self._cxx_hunspell.analyze(&s_list, c_word)
+                elif action_e == suggest:
+                    count = self._cxx_hunspell.suggest(&s_list, c_word)
+                elif action_e == suffix_suggest:
+                    count = self._cxx_hunspell.suffix_suggest(&s_list, c_word)
+                else:
+                    raise ValueError("Unexpected tuple action {} for hunspell".format(action_to_string(action_e)))
 
             results_list = []
             for i from 0 <= i < count:
@@ -462,34 +887,226 @@ cdef class HunspellWrap(object):
 
         return ret_dict
 
+    cdef Hunspell *_thread_hspell(self, int tid) except NULL:
+        '''Returns the Hunspell instance owned by worker thread tid, creating it on first use'''
+        cdef Hunspell **grown
+        cdef MutationBatch batch
+        cdef MutationWorkerArgs replay_args
+        cdef int i
+        if tid >= self._n_thread_hspells:
+            grown = <Hunspell **>realloc(self._thread_hspells, (tid + 1) * sizeof(Hunspell *))
+            if grown is NULL:
+                raise MemoryError()
+            for i from self._n_thread_hspells <= i <= tid:
+                grown[i] = NULL
+            self._thread_hspells = grown
+            self._n_thread_hspells = tid + 1
+
+        if self._thread_hspells[tid] is NULL:
+            self._thread_hspells[tid] = self._create_hspell_inst(self.lang)
+            # Bring the new instance up to date with the runtime changes made so far
+            for entry in self._mutation_log:
+                if isinstance(entry, MutationBatch):
+                    batch = entry
+                    replay_args.hspell = self._thread_hspells[tid]
+                    replay_args.n_words = batch.n_words
+                    replay_args.word_list = batch.words
+                    replay_args.example_list = batch.examples
+                    replay_args.removals = batch.removals
+                    replay_args.statuses = NULL
+                    mutation_worker(&replay_args)
+                else:
+                    hspell_add_dic(self._thread_hspells[tid], entry[0], entry[1])
+        return self._thread_hspells[tid]
+
+    cdef void check_encodable(self, basestring word) except *:
+        # Raises the same UnicodeEncodeError a direct Hunspell call would
+        if not isinstance(word, bytes):
+            word.encode(self._dic_encoding, 'strict')
+
+    cdef dict c_mutate(self, list words, examples, bint removal, bint threaded):
+        cdef MutationBatch batch
+        start = time.time()
+        batch = batch_from_words(words, examples, removal, self._dic_encoding)
+        return self._apply_and_report(batch, words, words if removal else [], time.time() - start,
+            threaded)
+
+    cdef dict _apply_and_report(self, MutationBatch batch, list words, list removed, double prepare_time,
+            bint threaded=True):
+        cdef int *statuses = <int *>malloc((batch.n_words + 1) * sizeof(int))
+        cdef int i
+        cdef list status = []
+        if statuses is NULL:
+            raise MemoryError()
+        try:
+            for i from 0 <= i < batch.n_words:
+                statuses[i] = -1
+            start = time.time()
+            instances = self._c_apply_batch(batch, statuses, threaded)
+            apply_time = time.time() - start
+            # Parallel to words, as they can repeat or fail to decode
+            for i from 0 <= i < batch.n_words:
+                status.append(statuses[i])
+        finally:
+            free(statuses)
+
+        self._mutation_log.append(batch)
+        batch.update_digest(self._changes_digest)
+        removed_set = set(removed)
+        self._invalidate_cached_words([word for word in words if word not in removed_set], removed,
+            batch.has_examples())
+        return {
+            'status': status,
+            'prepare_time': prepare_time,
+            'apply_time': apply_time,
+            'instances': instances,
+        }
+
+    cdef int _c_apply_batch(self, MutationBatch batch, int *statuses, bint threaded) except -1:
+        '''Applies a batch to the main and every thread instance, returns the instance count'''
+        with self._pool_lock:
+            return self._c_apply_batch_locked(batch, statuses, threaded)
+
+    cdef int _c_apply_batch_locked(self, MutationBatch batch, int *statuses, bint threaded) except -1:
+        cdef int n_instances = 1
+        cdef int i, rc = 0
+        cdef thread_t **threads = NULL
+        cdef MutationWorkerArgs *thread_args = NULL
+
+        for i from 0 <= i < self._n_thread_hspells:
+            if self._thread_hspells[i] is not NULL:
+                n_instances += 1
+        thread_args = <MutationWorkerArgs *>calloc(n_instances, sizeof(MutationWorkerArgs))
+        if thread_args is NULL:
+            raise MemoryError()
+
+        try:
+            thread_args[0].hspell = self._cxx_hunspell
+            thread_args[0].statuses = statuses
+            n_instances = 1
+            for i from 0 <= i < self._n_thread_hspells:
+                if self._thread_hspells[i] is not NULL:
+                    thread_args[n_instances].hspell = self._thread_hspells[i]
+                    thread_args[n_instances].statuses = NULL
+                    n_instances += 1
+            for i from 0 <= i < n_instances:
+                thread_args[i].n_words = batch.n_words
+                thread_args[i].word_list = batch.words
+                thread_args[i].example_list = batch.examples
+                thread_args[i].removals = batch.removals
+
+            if not threaded or n_instances == 1:
+                # Thread instances are covered by the pool lock and the main one by its own
+                with self._main_lock:
+                    with nogil:
+                        for i from 0 <= i < n_instances:
+                            mutation_worker(&thread_args[i])
+                return n_instances
+
+            # Every thread instance is independent, so each one is updated on its own thread
+            threads = <thread_t **>calloc(n_instances, sizeof(thread_t *))
+            if threads is NULL:
+                raise MemoryError()
+            try:
+                for i from 1 <= i < n_instances:
+                    threads[i] = thread_create(&mutation_worker, <void *> &thread_args[i])
+                    if threads[i] is NULL:
+                        raise OSError("Could not create thread")
+                # Other python threads use the main instance under its lock, so it is updated here
+                with self._main_lock:
+                    with nogil:
+                        mutation_worker(&thread_args[0])
+            finally:
+                # Wait for every started thread before releasing what they use
+                with nogil:
+                    for i from 1 <= i < n_instances:
+                        if threads[i] is not NULL and thread_join(threads[i]) and not rc:
+                            rc = 1
+                dealloc_threads(threads, n_instances)
+            if rc:
+                raise OSError("Could not join thread")
+            return n_instances
+        finally:
+            free(thread_args)
+
+    cdef void _private_caches(self) except *:
+        '''Moves this wrapper's results into caches of its own, dictionary changes make
+        # them diverge from the caches shared by wrappers of the unchanged dictionary'''
+        if isinstance(self._suggest_cache, IndexedCache):
+            return
+        self._suggest_cache = IndexedCache(self._suggest_cache.items())
+        self._suffix_cache = IndexedCache(self._suffix_cache.items())
+        self._analyze_cache = IndexedCache(self._analyze_cache.items(), analyses=True)
+        self._stem_cache = IndexedCache(self._stem_cache.items())
+
+    cdef void _invalidate_cached_words(self, list added, list removed, bint affixed) except *:
+        '''Drops the cache entries a dictionary change affects, added is None when a whole
+        # dictionary file was added'''
+        if self._shared_cache_dir:
+            # Other processes still rely on the shared entries, so rather than dropping any
+            # the results move to a namespace of the changed dictionary within the same files.
+            # Entries of earlier states are evicted like any other stale entry.
+            namespace = self.changes_fingerprint()
+            self._suggest_cache.namespace = namespace
+            self._suffix_cache.namespace = namespace
+            self._analyze_cache.namespace = namespace
+            self._stem_cache.namespace = namespace
+            return
+        self._private_caches()
+        caches = (self._suggest_cache, self._suffix_cache, self._analyze_cache, self._stem_cache)
+        for cache in caches:
+            for word in (added or []) + removed:
+                cache.pop(word, None)
+        if added is None or added:
+            # Suggestions draw on the whole word list, any new word may belong in them
+            self._suggest_cache.clear()
+            self._suffix_cache.clear()
+            if affixed:
+                # Hunspell can't list the affixed forms of a word, but only forms cached
+                # as unknown can start resolving to the new words
+                self._stem_cache.drop_dependents(None)
+                self._analyze_cache.drop_dependents(None)
+        for word in set(removed):
+            for cache in caches:
+                cache.drop_dependents(word)
+        if self._disk_cache_dir:
+            # Results hold for this state of the dictionary, so they are saved under its changes
+            manager = get_cache_manager(self._cache_manager_name)
+            for kind, cache in zip(('suggest', 'suffix', 'analyze', 'stem'), caches):
+                cache.persist_as(manager, '{}_{}'.format(self._cache_name(kind), self.changes_fingerprint()))
+
     cdef void _c_threaded_bulk_action(self, char **word_array, char ***output_array, int n_words, action_type action_e, int *output_counts) except *:
         '''C realm thread dispatcher'''
         # Allocate all memory per thread
-        cdef thread_t **threads = <thread_t **>calloc(self.max_threads, sizeof(thread_t *))
-        cdef ThreadWorkerArgs *thread_args = <ThreadWorkerArgs *>calloc(self.max_threads, sizeof(ThreadWorkerArgs))
-        cdef int rc, i, stride
+        cdef int n_threads = self.max_threads
+        cdef thread_t **threads = <thread_t **>calloc(n_threads, sizeof(thread_t *))
+        cdef ThreadWorkerArgs *thread_args = <ThreadWorkerArgs *>calloc(n_threads, sizeof(ThreadWorkerArgs))
+        cdef int rc = 0, i, stride
 
         if thread_args is NULL or threads is NULL:
+            free(thread_args)
+            free(threads)
             raise MemoryError()
 
+        self._pool_lock.acquire()
         try:
             # Divide workload between threads
-            words_per_thread = n_words // self.max_threads
+            words_per_thread = n_words // n_threads
             words_distributed = 0
             # If uneven, round down on workers per thread (but the last thread will have extra work to do)
-            if n_words == 0 or n_words % self.max_threads != 0:
-                words_per_thread = (n_words - (n_words % self.max_threads)) // self.max_threads
+            if n_words == 0 or n_words % n_threads != 0:
+                words_per_thread = (n_words - (n_words % n_threads)) // n_threads
 
-            for i from 0 <= i < self.max_threads:
+            for i from 0 <= i < n_threads:
                 stride = i * words_per_thread
                 thread_args[i].tid = i
                 thread_args[i].action_e = action_e
 
-                # Allocate one Hunspell Dict per thread since it isn't safe.
-                thread_args[i].hspell = self._create_hspell_inst(self.lang)
+                # Use one Hunspell Dict per thread since it isn't safe.
+                thread_args[i].hspell = self._thread_hspell(i)
 
                 # Account for leftovers
-                if i == self.max_threads - 1:
+                if i == n_threads - 1:
                     thread_args[i].n_words = n_words - words_distributed
                 else:
                     thread_args[i].n_words = words_per_thread
@@ -504,21 +1121,52 @@ cdef class HunspellWrap(object):
                 threads[i] = thread_create(&hunspell_worker, <void *> &thread_args[i])
                 if threads[i] is NULL:
                     raise OSError("Could not create thread")
-
-            # wait for each thread to complete
-            for i from 0 <= i < self.max_threads:
-                # block until thread i completes
-                rc = thread_join(threads[i])
-                if rc:
-                    raise OSError(rc, "Could not join thread")
-
-                # Free Hunspell Dict
-                del thread_args[i].hspell
         finally:
+            # wait for each started thread to complete
+            with nogil:
+                for i from 0 <= i < n_threads:
+                    if threads[i] is not NULL and thread_join(threads[i]) and not rc:
+                        rc = 1
+            self._pool_lock.release()
             # Free top level stuff
-            if thread_args is not NULL:
-                free(thread_args)
-            dealloc_threads(threads, self.max_threads)
+            free(thread_args)
+            dealloc_threads(threads, n_threads)
+        if rc:
+            raise OSError("Could not join thread")
+
+    cdef dict c_bulk_spell(self, words):
+        '''Accepts a list of words, returns a dict of words mapped to whether they're correct.
+        # Like spell the results aren't cached, Hunspell answers them quickly enough'''
+        cdef list unique_words = list(dict.fromkeys(words))
+        cdef int n_words = len(unique_words)
+        cdef char **word_array = NULL
+        cdef char ***output_array = NULL
+        cdef int *output_counts = NULL
+        cdef dict ret_dict = {}
+        cdef int i
+        if not n_words:
+            return ret_dict
+
+        try:
+            word_array = <char **>calloc(n_words, sizeof(char *))
+            output_array = <char ***>calloc(n_words, sizeof(char **))
+            output_counts = <int *>calloc(n_words, sizeof(int))
+            if word_array is NULL or output_array is NULL or output_counts is NULL:
+                raise MemoryError()
+            for i, word in enumerate(unique_words):
+                copy_to_c_string(word, &word_array[i], self._dic_encoding)
+
+            self._c_threaded_bulk_action(word_array, output_array, n_words, spell, output_counts)
+            for i from 0 <= i < n_words:
+                ret_dict[unique_words[i]] = output_counts[i] != 0
+            return ret_dict
+        finally:
+            if word_array is not NULL:
+                for i from 0 <= i < n_words:
+                    free(word_array[i])
+                free(word_array)
+            free(output_array)
+            free(output_counts)
 
     cdef void _parse_bulk_results(self, dict ret_dict, list unknown_words, int *output_counts, char ***output_array) except *:
         '''Parse the return of a bulk action'''
@@ -577,3 +1225,420 @@ cdef class HunspellWrap(object):
             if output_counts is not NULL:
                 free(output_counts)
 
+#//////////////////////////////////////////////////////////////////////////////
+cdef class MultiHunspellWrap(object):
+    # Composite over several dictionaries sharing one cache
+    cdef public list dictionaries
+    cdef public int max_threads
+    cdef public basestring _cache_manager_name
+    cdef public basestring _disk_cache_dir
+    cdef public basestring _shared_cache_dir
+    cdef public object _shared_cache_size
+    cdef public object _spell_cache
+    cdef public object _suggest_cache
+    # Number of changes made to each dictionary which the caches account for
+    cdef tuple _seen_changes
+
+    def __init__(self, dictionaries=('en_US',), basestring cache_manager="hunspell",
+            basestring disk_cache_dir=None, basestring hunspell_data_dir=None,
+            basestring system_encoding=None, basestring shared_cache_dir=None,
+            shared_cache_size=None):
+        # Dictionaries are checked in the given order, each either a language name or a Hunspell object
+        if isinstance(dictionaries, (basestring, HunspellWrap)):
+            dictionaries = [dictionaries]
+        self.dictionaries = []
+        for dictionary in dictionaries:
+            if not isinstance(dictionary, HunspellWrap):
+                dictionary = HunspellWrap(dictionary, cache_manager=cache_manager,
+                    disk_cache_dir=disk_cache_dir, hunspell_data_dir=hunspell_data_dir,
+                    system_encoding=system_encoding, shared_cache_dir=shared_cache_dir,
+                    shared_cache_size=shared_cache_size)
+            self.dictionaries.append(dictionary)
+        if not self.dictionaries:
+            raise ValueError("At least one dictionary is required")
+
+        self.max_threads = detect_cpus()
+        self._cache_manager_name = cache_manager
+        if shared_cache_dir is None:
+            shared_cache_dir = os.environ.get("HUNSPELL_SHARED_CACHE")
+        self._disk_cache_dir = disk_cache_dir
+        self._shared_cache_dir = shared_cache_dir
+        self._shared_cache_size = shared_cache_size
+        self._bind_caches()
+        self._seen_changes = self._changes()
+
+    @property
+    def langs(self):
+        return tuple(dictionary.lang for dictionary in self.dictionaries)
+
+    def _bind_caches(self):
+        # Caches are keyed by the full dictionary set
+        manager = get_cache_manager(self._cache_manager_name)
+        if self._disk_cache_dir:
+            manager.cache_directory = self._disk_cache_dir
+        self._spell_cache = retrieve_cache(manager, self._cache_name('spell'),
+            self._disk_cache_dir, self._shared_cache_dir, self._shared_cache_size)
+        self._suggest_cache = retrieve_cache(manager, self._cache_name('suggest'),
+            self._disk_cache_dir, self._shared_cache_dir, self._shared_cache_size)
+
+    def _cache_name(self, basestring kind):
+        identity = '|'.join(['{}:{}'.format(dictionary.lang, dictionary._hunspell_dir)
+            for dictionary in self.dictionaries])
+        return "hunspell_multi_{kind}_{langs}_{hash}".format(
+            kind=kind, langs='+'.join(self.langs), hash=md5(identity))
+
+    def changes_fingerprint(self):
+        '''Identifies the runtime changes made to all of the dictionaries, empty when there are none'''
+        fingerprints = [dictionary.changes_fingerprint() for dictionary in self.dictionaries]
+        return md5(u'|'.join(fingerprints)) if any(fingerprints) else u''
+
+    def _dictionary_index(self, basestring lang):
+        if lang is None:
+            return 0
+        for d, dictionary in enumerate(self.dictionaries):
+            if dictionary.lang == lang:
+                return d
+        raise ValueError("No dictionary for language {}".format(lang))
+
+    def add_dic(self, basestring dpath, basestring key=None, basestring lang=None):
+        # Python load extra dictionaries into one of the dictionaries (the first by default)
+        cdef int d = self._dictionary_index(lang)
+        self._sync_changes()
+        result = self.dictionaries[d].add_dic(dpath, key)
+        self._invalidate_cached_words(None, [], True)
+        self._seen_changes = self._changes()
+        return result
+
+    def bulk_add(self, words, examples=None, basestring lang=None):
+        # Adds words to one of the dictionaries (the first by default), see Hunspell.bulk_add
+        cdef int d = self._dictionary_index(lang)
+        words = list(words)
+        self._sync_changes()
+        report = self.dictionaries[d].bulk_add(words, examples)
+        self._invalidate_cached_words(words, [], bool(examples))
+        self._seen_changes = self._changes()
+        return report
+
+    def bulk_remove(self, words, basestring lang=None):
+        cdef int d = self._dictionary_index(lang)
+        words = list(words)
+        self._sync_changes()
+        report = self.dictionaries[d].bulk_remove(words)
+        self._invalidate_cached_words([], words, False)
+        self._seen_changes = self._changes()
+        return report
+
+    def load_wordlist(self, basestring path, basestring lang=None):
+        cdef int d = self._dictionary_index(lang)
+        cdef HunspellWrap dictionary = self.dictionaries[d]
+        self._sync_changes()
+        report, added, removed, affixed = dictionary.c_load_wordlist(path)
+        self._invalidate_cached_words(added, removed, affixed)
+        self._seen_changes = self._changes()
+        return report
+
+    def spell(self, basestring word):
+        # Python individual word spellcheck against every dictionary
+        return self.c_multi_action(spell, [word], False)[word]
+
+    def suggest(self, basestring word):
+        # Python individual word suggestions merged across dictionaries
+        return self.c_multi_action(suggest, [word], False)[word]
+
+    def bulk_spell(self, words):
+        return self.c_multi_action(spell, words, True)
+
+    def bulk_suggest(self, words):
+        return self.c_multi_action(suggest, words, True)
+
+    def save_cache(self):
+        self._spell_cache.save()
+        self._suggest_cache.save()
+
+    def clear_cache(self):
+        self._spell_cache.clear()
+        self._suggest_cache.clear()
+
+    def set_concurrency(self, max_threads):
+        self.max_threads = max_threads
+
+    def open_document(self, text, suggest=True):
+        '''Returns a DocumentSession which re-checks only the edited parts of text'''
+        return DocumentSession(self, text, suggest)
+
+    ###################
+    # Cache Invalidation
+    ###################
+
+    cdef tuple _changes(self):
+        cdef HunspellWrap dictionary
+        cdef list changes = []
+        for dictionary in self.dictionaries:
+            changes.append(len(dictionary._mutation_log))
+        return tuple(changes)
+
+    cdef void _sync_changes(self) except *:
+        '''Dictionaries changed directly rather than through this object could have affected
+        # any cached result, so all of them are dropped'''
+        if self._changes() != self._seen_changes:
+            if self._shared_cache_dir:
+                self._shared_namespace()
+            else:
+                self._private_caches()
+                self._spell_cache.clear()
+                self._suggest_cache.clear()
+                self._persist_changed_caches()
+            self._seen_changes = self._changes()
+
+    cdef void _shared_namespace(self) except *:
+        # Same as Hunspell, results of changed dictionaries are kept apart within the shared files
+        self._spell_cache.namespace = self.changes_fingerprint()
+        self._suggest_cache.namespace = self.changes_fingerprint()
+
+    cdef void _persist_changed_caches(self) except *:
+        # Same as Hunspell, disk cached results are saved under a name of the changes
+        if self._disk_cache_dir:
+            manager = get_cache_manager(self._cache_manager_name)
+            self._spell_cache.persist_as(manager, '{}_{}'.format(self._cache_name('spell'), self.changes_fingerprint()))
+            self._suggest_cache.persist_as(manager,
+                '{}_{}'.format(self._cache_name('suggest'), self.changes_fingerprint()))
+
+    cdef void _private_caches(self) except *:
+        # Same as Hunspell, changed dictionaries get caches of their own
+        if isinstance(self._spell_cache, IndexedCache):
+            return
+        self._spell_cache = IndexedCache(self._spell_cache.items())
+        self._suggest_cache = IndexedCache(self._suggest_cache.items())
+
+    cdef void _invalidate_cached_words(self, list added, list removed, bint affixed) except *:
+        '''Drops the cache entries a dictionary change affects, added is None when a whole
+        # dictionary file was added'''
+        if self._shared_cache_dir:
+            self._shared_namespace()
+            return
+        self._private_caches()
+        for word in (added or []) + removed:
+            self._spell_cache.pop(word, None)
+            self._suggest_cache.pop(word, None)
+        if added is None or added:
+            # Suggestions draw on the whole word list, any new word may belong in them
+            self._suggest_cache.clear()
+            if affixed:
+                # Only forms cached as unknown can start resolving to the new words
+                self._spell_cache.drop_dependents(None)
+        for word in set(removed):
+            # Accepted words are indexed under the root they were accepted through
+            self._spell_cache.drop_dependents(word)
+            self._suggest_cache.drop_dependents(word)
+        self._persist_changed_caches()
+
+    ###################
+    # C-Operations
+    ###################
+
+    cdef dict c_multi_action(self, action_type action_e, words, bint threaded):
+        '''Accepts a list of words, returns a dict of words mapped to their spell check
+        # result or to a tuple of suggestions merged across all dictionaries'''
+        cdef dict ret_dict = {}
+        cdef list unknown_words = []
+
+        self._sync_changes()
+
+        for word in words:
+            if word in ret_dict:
+                continue
+            if word in self._spell_cache and self._spell_cache[word]:
+                # Accepted by one of the dictionaries
+                ret_dict[word] = True if action_e == spell else (word,)
+            elif action_e == spell and word in self._spell_cache:
+                ret_dict[word] = False
+            elif action_e == suggest and word in self._suggest_cache:
+                ret_dict[word] = self._suggest_cache[word]
+            else:
+                ret_dict[word] = None
+                unknown_words.append(word)
+
+        if unknown_words:
+            self._multi_unknown_words(unknown_words, action_e, ret_dict, threaded)
+
+        return ret_dict
+
+    cdef void _multi_unknown_words(self, list unknown_words, action_type action_e, dict ret_dict, bint threaded) except *:
+        cdef int n_words = len(unknown_words)
+        cdef int n_dicts = len(self.dictionaries)
+        cdef int i, j, d, idx
+        cdef HunspellWrap dictionary
+        cdef MultiThreadWorkerArgs inline_args
+        cdef Hunspell **hspells = NULL
+        # Every array is laid out dictionary major: index = d * n_words + i
+        cdef char **word_lists = <char **>calloc(n_words * n_dicts, sizeof(char *))
+        cdef char ***output_array = <char ***>calloc(n_words * n_dicts, sizeof(char **))
+        cdef int *output_counts = <int *>calloc(n_words * n_dicts, sizeof(int))
+        cdef int *accepted_by = <int *>calloc(n_words, sizeof(int))
+        cdef char **roots = <char **>calloc(n_words, sizeof(char *))
+
+        try:
+            if (word_lists is NULL or output_array is NULL or output_counts is NULL or accepted_by is NULL
+                    or roots is NULL):
+                raise MemoryError()
+
+            for d from 0 <= d < n_dicts:
+                dictionary = self.dictionaries[d]
+                for i from 0 <= i < n_words:
+                    try:
+                        copy_to_c_string(unknown_words[i], &word_lists[d * n_words + i], dictionary._dic_encoding)
+                    except UnicodeEncodeError:
+                        # Can't be in this dictionary, leave it NULL so the worker skips it
+                        pass
+
+            if threaded and n_words > 1 and self.max_threads > 1:
+                self._c_threaded_multi_action(word_lists, output_array, output_counts, accepted_by, roots,
+                    n_words, action_e)
+            else:
+                # Small requests run on the calling thread against the main instances
+                hspells = <Hunspell **>calloc(n_dicts, sizeof(Hunspell *))
+                if hspells is NULL:
+                    raise MemoryError()
+                for d from 0 <= d < n_dicts:
+                    dictionary = self.dictionaries[d]
+                    hspells[d] = dictionary._cxx_hunspell
+                inline_args.tid = 0
+                inline_args.hspells = hspells
+                inline_args.n_dicts = n_dicts
+                inline_args.offset = 0
+                inline_args.n_words = n_words
+                inline_args.total_words = n_words
+                inline_args.word_lists = word_lists
+                inline_args.output_array_ptr = output_array
+                inline_args.output_counts = output_counts
+                inline_args.accepted_by = accepted_by
+                inline_args.roots = roots
+                inline_args.action_e = action_e
+                # The main instances are shared with other python threads, locked in a fixed order
+                main_locks = sorted(set([entry._main_lock for entry in self.dictionaries]), key=id)
+                for lock in main_locks:
+                    lock.acquire()
+                try:
+                    with nogil:
+                        multi_hunspell_worker(&inline_args)
+                finally:
+                    for lock in reversed(main_locks):
+                        lock.release()
+
+            # Parse the return
+            for i from 0 <= i < n_words:
+                word = unknown_words[i]
+                if accepted_by[i] == -1:
+                    self._spell_cache[word] = False
+                else:
+                    # Remember the root the word was accepted through, removing it invalidates the word
+                    dictionary = self.dictionaries[accepted_by[i]]
+                    root = c_string_to_unicode_no_except(roots[i], dictionary._dic_encoding) if roots[i] is not NULL else None
+                    self._spell_cache[word] = root if root and root != word else True
+                if action_e == spell:
+                    ret_dict[word] = accepted_by[i] != -1
+                elif accepted_by[i] != -1:
+                    ret_dict[word] = (word,)
+                else:
+                    suggestion_lists = []
+                    for d from 0 <= d < n_dicts:
+                        dictionary = self.dictionaries[d]
+                        idx = d * n_words + i
+                        suggestions = []
+                        for j from 0 <= j < output_counts[idx]:
+                            suggestions.append(c_string_to_unicode_no_except(output_array[idx][j], dictionary._dic_encoding))
+                        suggestion_lists.append(suggestions)
+                    ret_dict[word] = merge_suggestions(suggestion_lists)
+                    self._suggest_cache[word] = ret_dict[word]
+        finally:
+            if hspells is not NULL:
+                free(hspells)
+            for d from 0 <= d < n_dicts:
+                dictionary = self.dictionaries[d]
+                for i from 0 <= i < n_words:
+                    idx = d * n_words + i
+                    if output_array is not NULL and output_counts is not NULL and output_counts[idx]:
+                        dictionary._cxx_hunspell.free_list(output_array + idx, output_counts[idx])
+                    if word_lists is not NULL and word_lists[idx] is not NULL:
+                        free(word_lists[idx])
+            if word_lists is not NULL:
+                free(word_lists)
+            if output_array is not NULL:
+                free(output_array)
+            if output_counts is not NULL:
+                free(output_counts)
+            if accepted_by is not NULL:
+                free(accepted_by)
+            if roots is not NULL:
+                for i from 0 <= i < n_words:
+                    if roots[i] is not NULL:
+                        free(roots[i])
+                free(roots)
+
+    cdef void _c_threaded_multi_action(self, char **word_lists, char ***output_array, int *output_counts,
+            int *accepted_by, char **roots, int n_words, action_type action_e) except *:
+        '''C realm thread dispatcher for checking words against every dictionary'''
+        cdef int n_dicts = len(self.dictionaries)
+        cdef int n_threads = min(self.max_threads, n_words)
+        cdef thread_t **threads = <thread_t **>calloc(n_threads, sizeof(thread_t *))
+        cdef MultiThreadWorkerArgs *thread_args = <MultiThreadWorkerArgs *>calloc(n_threads, sizeof(MultiThreadWorkerArgs))
+        cdef int rc = 0, i, d, words_per_thread, words_distributed = 0
+        cdef HunspellWrap dictionary
+        # Every distinct dictionary's thread instances, locked in a fixed order so composites
+        # sharing dictionaries can't deadlock each other
+        cdef list pool_locks = sorted(set([entry._pool_lock for entry in self.dictionaries]), key=id)
+
+        for lock in pool_locks:
+            lock.acquire()
+        try:
+            if thread_args is NULL or threads is NULL:
+                raise MemoryError()
+
+            # Divide workload between threads, the last thread picks up the leftovers
+            words_per_thread = n_words // n_threads
+            for i from 0 <= i < n_threads:
+                thread_args[i].tid = i
+                thread_args[i].action_e = action_e
+                thread_args[i].n_dicts = n_dicts
+                thread_args[i].total_words = n_words
+                thread_args[i].word_lists = word_lists
+                thread_args[i].output_array_ptr = output_array
+                thread_args[i].output_counts = output_counts
+                thread_args[i].accepted_by = accepted_by
+                thread_args[i].roots = roots
+                thread_args[i].offset = words_distributed
+                if i == n_threads - 1:
+                    thread_args[i].n_words = n_words - words_distributed
+                else:
+                    thread_args[i].n_words = words_per_thread
+                    words_distributed += words_per_thread
+
+                # Use each dictionary's instance for this thread since they aren't safe to share.
+                thread_args[i].hspells = <Hunspell **>calloc(n_dicts, sizeof(Hunspell *))
+                if thread_args[i].hspells is NULL:
+                    raise MemoryError()
+                for d from 0 <= d < n_dicts:
+                    dictionary = self.dictionaries[d]
+                    thread_args[i].hspells[d] = dictionary._thread_hspell(i)
+
+            for i from 0 <= i < n_threads:
+                threads[i] = thread_create(&multi_hunspell_worker, <void *> &thread_args[i])
+                if threads[i] is NULL:
+                    raise OSError("Could not create thread")
+        finally:
+            # Wait for every started thread before tearing down what they use
+            if threads is not NULL:
+                with nogil:
+                    for i from 0 <= i < n_threads:
+                        if threads[i] is not NULL and thread_join(threads[i]) and not rc:
+                            rc = 1
+            for lock in reversed(pool_locks):
+                lock.release()
+            if thread_args is not NULL:
+                for i from 0 <= i < n_threads:
+                    if thread_args[i].hspells is not NULL:
+                        free(thread_args[i].hspells)
+                free(thread_args)
+            dealloc_threads(threads, n_threads)
+        if rc:
+            raise OSError("Could not join thread")
@@ -0,0 +1,205 @@
+import struct
+
+# Wire format shared by hunspell.serve and hunspell.client.
+#
+# Every message is a frame: a 4-byte big-endian payload length followed by the payload.
+# Request payload:  1 byte opcode, then one encoded value holding the argument tuple.
+# Response payload: 1 byte status (STATUS_OK / STATUS_ERROR), then one encoded value.
+#   On error the value is a (exception class name, message) tuple.
+#
+# Values are tagged with a single byte so that bools, numbers, strings, tuples and dicts
+# can be exchanged without pulling in a serialization dependency.
+
+OP_SPELL = 1
+OP_SUGGEST = 2
+OP_SUFFIX_SUGGEST = 3
+OP_STEM = 4
+OP_ANALYZE = 5
+OP_BULK_SUGGEST = 6
+OP_BULK_SUFFIX_SUGGEST = 7
+OP_BULK_STEM = 8
+OP_BULK_ANALYZE = 9
+OP_ADD = 10
+OP_REMOVE = 11
+OP_ADD_DIC = 12
+OP_SAVE_CACHE = 13
+OP_CLEAR_CACHE = 14
+OP_SET_CONCURRENCY = 15
+OP_STATS = 16
+OP_BULK_ADD = 17
+OP_BULK_REMOVE = 18
+OP_LOAD_WORDLIST = 19
+OP_BULK_SPELL = 20
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+_FRAME_HEADER = struct.Struct('>I')
+_UINT32 = struct.Struct('>I')
+_INT64 = struct.Struct('>q')
+_DOUBLE = struct.Struct('>d')
+
+_TAG_NONE = b'N'
+_TAG_TRUE = b'T'
+_TAG_FALSE = b'F'
+_TAG_INT = b'I'
+_TAG_FLOAT = b'D'
+_TAG_STR = b'S'
+_TAG_BYTES = b'B'
+_TAG_TUPLE = b'L'
+_TAG_DICT = b'M'
+
+
+class ProtocolError(IOError):
+    pass
+
+
+def _encode_value(value, parts):
+    if value is None:
+        parts.append(_TAG_NONE)
+    elif value is True:
+        parts.append(_TAG_TRUE)
+    elif value is False:
+        parts.append(_TAG_FALSE)
+    elif isinstance(value, int):
+        parts.append(_TAG_INT)
+        parts.append(_INT64.pack(value))
+    elif isinstance(value, float):
+        parts.append(_TAG_FLOAT)
+        parts.append(_DOUBLE.pack(value))
+    elif isinstance(value, str):
+        raw = value.encode('utf-8', 'surrogatepass')
+        parts.append(_TAG_STR)
+        parts.append(_UINT32.pack(len(raw)))
+        parts.append(raw)
+    elif isinstance(value, bytes):
+        parts.append(_TAG_BYTES)
+        parts.append(_UINT32.pack(len(value)))
+        parts.append(value)
+    elif isinstance(value, (tuple, list)):
+        parts.append(_TAG_TUPLE)
+        parts.append(_UINT32.pack(len(value)))
+        for item in value:
+            _encode_value(item, parts)
+    elif isinstance(value, dict):
+        parts.append(_TAG_DICT)
+        parts.append(_UINT32.pack(len(value)))
+        for key, item in value.items():
+            _encode_value(key, parts)
+            _encode_value(item, parts)
+    else:
+        raise ProtocolError("Cannot encode value of type {}".format(type(value).__name__))
+
+
+def _decode_value(buf, offset):
+    tag = buf[offset:offset + 1]
+    offset += 1
+    if tag == _TAG_NONE:
+        return None, offset
+    elif tag == _TAG_TRUE:
+        return True, offset
+    elif tag == _TAG_FALSE:
+        return False, offset
+    elif tag == _TAG_INT:
+        return _INT64.unpack_from(buf, offset)[0], offset + _INT64.size
+    elif tag == _TAG_FLOAT:
+        return _DOUBLE.unpack_from(buf, offset)[0], offset + _DOUBLE.size
+    elif tag == _TAG_STR or tag == _TAG_BYTES:
+        length = _UINT32.unpack_from(buf, offset)[0]
+        offset += _UINT32.size
+        end = offset + length
+        if end > len(buf):
+            raise ProtocolError("Truncated string value")
+        if tag == _TAG_BYTES:
+            return bytes(buf[offset:end]), end
+        return bytes(buf[offset:end]).decode('utf-8', 'surrogatepass'), end
+    elif tag == _TAG_TUPLE:
+        count = _UINT32.unpack_from(buf, offset)[0]
+        offset += _UINT32.size
+        items = []
+        for _ in range(count):
+            item, offset = _decode_value(buf, offset)
+            items.append(item)
+        return tuple(items), offset
+    elif tag == _TAG_DICT:
+        count = _UINT32.unpack_from(buf, offset)[0]
+        offset += _UINT32.size
+        result = {}
+        for _ in range(count):
+            key, offset = _decode_value(buf, offset)
+            result[key], offset = _decode_value(buf, offset)
+        return result, offset
+    else:
+        raise ProtocolError("Unexpected value tag {!r}".format(tag))
+
+
+def encode_value(value):
+    '''Encodes a single value, also used for storing results in shared caches'''
+    parts = []
+    _encode_value(value, parts)
+    return b''.join(parts)
+
+
+def decode_value(buf):
+    try:
+        value, offset = _decode_value(buf, 0)
+    except struct.error as e:
+        raise ProtocolError("Truncated value: {}".format(e))
+    if offset != len(buf):
+        raise ProtocolError("Trailing bytes after value")
+    return value
+
+
+def encode_message(code, value):
+    '''Encodes an opcode (or status) and value into a complete frame'''
+    parts = [bytes((code,))]
+    _encode_value(value, parts)
+    payload = b''.join(parts)
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_message(payload):
+    '''Decodes a frame payload (without its length header) into (code, value)'''
+    if not payload:
+        raise ProtocolError("Empty message")
+    try:
+        value, offset = _decode_value(payload, 1)
+    except struct.error as e:
+        raise ProtocolError("Truncated message: {}".format(e))
+    if offset != len(payload):
+        raise ProtocolError("Trailing bytes after message")
+    return payload[0], value
+
+
+def _recv_exactly(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            if received == 0:
+                return None
+            raise ProtocolError("Connection closed mid-frame")
+        received += n
+    return buf
+
+
+def send_message(sock, code, value):
+    sock.sendall(encode_message(code, value))
+
+
+def recv_message(sock):
+    '''Reads one frame from the socket, returns (code, value) or None on a clean EOF'''
+    header = _recv_exactly(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+    size = _FRAME_HEADER.unpack(header)[0]
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError("Frame of {} bytes exceeds limit".format(size))
+    payload = _recv_exactly(sock, size)
+    if payload is None:
+        raise ProtocolError("Connection closed mid-frame")
+    return decode_message(bytes(payload))
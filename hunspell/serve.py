@@ -0,0 +1,519 @@
+import os
+import sys
+import stat
+import errno
+import time
+import socket
+import argparse
+import ipaddress
+import threading
+import socketserver
+from collections import deque
+from queue import Queue, Empty
+
+from .hunspell import HunspellWrap
+from .protocol import (
+    OP_SPELL, OP_SUGGEST, OP_SUFFIX_SUGGEST, OP_STEM, OP_ANALYZE,
+    OP_BULK_SUGGEST, OP_BULK_SUFFIX_SUGGEST, OP_BULK_STEM, OP_BULK_ANALYZE,
+    OP_ADD, OP_REMOVE, OP_ADD_DIC, OP_SAVE_CACHE, OP_CLEAR_CACHE, OP_SET_CONCURRENCY,
+    OP_STATS, OP_BULK_ADD, OP_BULK_REMOVE, OP_LOAD_WORDLIST, OP_BULK_SPELL,
+    STATUS_OK, STATUS_ERROR, ProtocolError, recv_message, send_message)
+
+# Single-word lookups which are coalesced into bulk calls
+SINGLE_ACTIONS = {
+    OP_SPELL: 'spell',
+    OP_SUGGEST: 'suggest',
+    OP_SUFFIX_SUGGEST: 'suffix_suggest',
+    OP_STEM: 'stem',
+    OP_ANALYZE: 'analyze',
+}
+
+BULK_ACTIONS = {
+    OP_BULK_SPELL: 'spell',
+    OP_BULK_SUGGEST: 'suggest',
+    OP_BULK_SUFFIX_SUGGEST: 'suffix_suggest',
+    OP_BULK_STEM: 'stem',
+    OP_BULK_ANALYZE: 'analyze',
+}
+
+
+def is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def wordlist_summary(report):
+    '''A load_wordlist report without its words and statuses, which would hand the contents
+    of the server side file back to the client'''
+    summary = dict(report)
+    del summary['words']
+    statuses = summary.pop('status')
+    summary['words'] = len(statuses)
+    summary['failed'] = sum(1 for status in statuses if status)
+    return summary
+
+
+class PendingRequest(object):
+    '''A decoded client request waiting on the dispatcher thread'''
+    __slots__ = ('opcode', 'args', 'result', 'error', 'done')
+
+    def __init__(self, opcode, args):
+        self.opcode = opcode
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def resolve(self, result):
+        self.result = result
+        self.done.set()
+
+    def fail(self, error):
+        self.error = error
+        self.done.set()
+
+
+class BatchDispatcher(object):
+    '''
+    Owns the hunspell instance and is the only thread to ever touch it. Requests that
+    arrive while a batch window is open are grouped per action and answered with a single
+    bulk call, so concurrent clients share the threaded (gil-less) bulk engine.
+    '''
+    def __init__(self, hunspell, batch_window=0.002, max_batch=4096, bulk_threshold=32,
+            file_dirs=()):
+        self.hunspell = hunspell
+        # Server side directories clients may load dictionaries and wordlists from, none
+        # by default as clients could otherwise read any file the server can
+        self.file_dirs = [os.path.realpath(directory) for directory in file_dirs]
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        # Unique uncached words below this count are looked up directly instead of
+        # paying for the per-thread dictionary setup of a bulk call
+        self.bulk_threshold = bulk_threshold
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._active_connections = 0
+        self._running = False
+        self._thread = None
+        self._recent_batch_sizes = deque(maxlen=1024)
+        self._stats = {
+            'requests': 0,
+            'batches': 0,
+            'bulk_calls': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'max_batch_size': 0,
+        }
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='hunspell-dispatcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+
+    def connection_opened(self):
+        with self._lock:
+            self._active_connections += 1
+
+    def connection_closed(self):
+        with self._lock:
+            self._active_connections -= 1
+
+    def submit(self, opcode, args):
+        '''Queues a request and blocks until the dispatcher has answered it'''
+        if not self._running:
+            raise RuntimeError("Hunspell server is not running")
+        request = PendingRequest(opcode, args)
+        self._queue.put(request)
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats['requests'] += 1
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            sizes = list(self._recent_batch_sizes)
+            stats['active_connections'] = self._active_connections
+        stats['queue_depth'] = self._queue.qsize()
+        stats['mean_batch_size'] = float(sum(sizes)) / len(sizes) if sizes else 0.0
+        stats['recent_batch_sizes'] = tuple(sizes[-32:])
+        stats['lang'] = self.hunspell.lang
+        stats['max_threads'] = self.hunspell.max_threads
+        return stats
+
+    ###################
+    # Dispatcher thread
+    ###################
+
+    def _collect_batch(self, first):
+        batch = [first]
+        deadline = time.time() + self.batch_window
+        while len(batch) < self.max_batch:
+            # Every connection is synchronous, so once each one has a request in the
+            # batch nothing else can arrive and waiting out the window is pure latency
+            with self._lock:
+                if len(batch) >= self._active_connections:
+                    break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except Empty:
+                break
+            if request is None:
+                self._running = False
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while self._running:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect_batch(first)
+            with self._lock:
+                self._stats['batches'] += 1
+                self._recent_batch_sizes.append(len(batch))
+                if len(batch) > self._stats['max_batch_size']:
+                    self._stats['max_batch_size'] = len(batch)
+
+            # Mutations and cache control act as barriers so requests keep their order
+            segment = []
+            for request in batch:
+                if request.opcode in SINGLE_ACTIONS or request.opcode in BULK_ACTIONS:
+                    segment.append(request)
+                else:
+                    self._process_lookups(segment)
+                    segment = []
+                    self._process_single(request)
+            self._process_lookups(segment)
+
+        # Release anyone still waiting once the server shuts down
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except Empty:
+                break
+            if request is not None:
+                request.fail(RuntimeError("Hunspell server is shutting down"))
+
+    def _process_lookups(self, segment):
+        if not segment:
+            return
+        try:
+            self._coalesced_lookups(segment)
+        except Exception:
+            # Fall back to answering one at a time so errors land on the right client
+            for request in segment:
+                if not request.done.is_set():
+                    self._process_single(request)
+
+    def _lookup(self, action, words):
+        '''Resolves unique words for an action via the cache, direct calls or one bulk call'''
+        hunspell = self.hunspell
+        results = {}
+        if action == 'spell':
+            # Spelling isn't cached, every word goes to Hunspell
+            missing = list(words)
+        else:
+            cache = getattr(hunspell, {
+                'suggest': '_suggest_cache',
+                'suffix_suggest': '_suffix_cache',
+                'stem': '_stem_cache',
+                'analyze': '_analyze_cache',
+            }[action])
+            missing = []
+            for word in words:
+                if word in cache:
+                    results[word] = cache[word]
+                else:
+                    missing.append(word)
+
+        if len(missing) >= self.bulk_threshold:
+            with self._lock:
+                self._stats['bulk_calls'] += 1
+            results.update(getattr(hunspell, 'bulk_' + action)(missing))
+        else:
+            for word in missing:
+                results[word] = hunspell.action(action, word)
+        return results
+
+    def _coalesced_lookups(self, segment):
+        hunspell = self.hunspell
+        words_by_action = {}
+        for request in segment:
+            action = SINGLE_ACTIONS.get(request.opcode) or BULK_ACTIONS[request.opcode]
+            words = request.args if request.opcode in BULK_ACTIONS else request.args[:1]
+            words_by_action.setdefault(action, set()).update(words)
+
+        suggest_words = words_by_action.get('suggest')
+        correct = set()
+        if suggest_words:
+            # bulk_suggest short circuits correctly spelled words, single suggest does not
+            correct = set(word for word, ok in self._lookup('spell', suggest_words).items() if ok)
+            words_by_action['suggest'] = suggest_words - correct
+
+        answers = {}
+        for action, words in words_by_action.items():
+            answers[action] = self._lookup(action, words)
+
+        for request in segment:
+            if request.opcode in BULK_ACTIONS:
+                action = BULK_ACTIONS[request.opcode]
+                result = {}
+                for word in request.args:
+                    if action == 'suggest' and word in correct:
+                        result[word] = (word,)
+                    else:
+                        result[word] = answers[action][word]
+                request.resolve(result)
+            else:
+                action = SINGLE_ACTIONS[request.opcode]
+                word = request.args[0]
+                if action == 'suggest' and word in correct:
+                    request.resolve(hunspell.suggest(word))
+                else:
+                    request.resolve(answers[action][word])
+
+    def _allowed_file(self, path):
+        '''Resolves a client given path, refusing anything outside the allowed directories'''
+        if not isinstance(path, str):
+            raise TypeError("File paths must be strings")
+        real_path = os.path.realpath(path)
+        for directory in self.file_dirs:
+            if os.path.commonpath([directory, real_path]) == directory:
+                return real_path
+        raise PermissionError(
+            "Loading '{}' is not allowed, the server only loads files from --allow-files-from directories".format(path))
+
+    def _process_single(self, request):
+        hunspell = self.hunspell
+        opcode = request.opcode
+        args = request.args
+        try:
+            if opcode in SINGLE_ACTIONS:
+                result = hunspell.action(SINGLE_ACTIONS[opcode], args[0])
+            elif opcode in BULK_ACTIONS:
+                result = getattr(hunspell, 'bulk_' + BULK_ACTIONS[opcode])(list(args))
+            elif opcode == OP_ADD:
+                result = hunspell.add(*args)
+            elif opcode == OP_REMOVE:
+                result = hunspell.remove(*args)
+            elif opcode == OP_BULK_ADD:
+                result = hunspell.bulk_add(list(args[0]), args[1])
+            elif opcode == OP_BULK_REMOVE:
+                result = hunspell.bulk_remove(list(args))
+            elif opcode == OP_LOAD_WORDLIST:
+                result = wordlist_summary(hunspell.load_wordlist(self._allowed_file(args[0])))
+            elif opcode == OP_ADD_DIC:
+                result = hunspell.add_dic(self._allowed_file(args[0]), *args[1:])
+            elif opcode == OP_SAVE_CACHE:
+                result = hunspell.save_cache()
+            elif opcode == OP_CLEAR_CACHE:
+                result = hunspell.clear_cache()
+            elif opcode == OP_SET_CONCURRENCY:
+                result = hunspell.set_concurrency(*args)
+            elif opcode == OP_STATS:
+                result = self.stats()
+            else:
+                raise ValueError("Unexpected opcode {} for hunspell server".format(opcode))
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            request.fail(e)
+        else:
+            request.resolve(result)
+
+
+class HunspellRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        dispatcher = self.server.dispatcher
+        dispatcher.connection_opened()
+        try:
+            while True:
+                try:
+                    message = recv_message(self.request)
+                except (ProtocolError, OSError):
+                    return
+                if message is None:
+                    return
+                opcode, args = message
+                try:
+                    if not isinstance(args, tuple):
+                        raise ValueError("Request arguments must be a tuple")
+                    result = dispatcher.submit(opcode, args)
+                except Exception as e:
+                    send_message(self.request, STATUS_ERROR, (type(e).__name__, str(e)))
+                else:
+                    send_message(self.request, STATUS_OK, result)
+        finally:
+            dispatcher.connection_closed()
+
+
+class HunspellTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, dispatcher):
+        self.dispatcher = dispatcher
+        socketserver.TCPServer.__init__(self, address, HunspellRequestHandler)
+
+    def get_request(self):
+        connection, address = socketserver.TCPServer.get_request(self)
+        # Requests are tiny and latency bound, don't let Nagle hold them back
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection, address
+
+
+def remove_stale_socket(path):
+    '''Removes a socket file left behind by a server which is no longer running. Anything
+    else at the path, including the socket of a live server, is left alone and raises.'''
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(errno.EEXIST, "Refusing to replace a file which is not a socket", path)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise OSError(errno.EADDRINUSE, "Another server is already listening", path)
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class HunspellUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path, dispatcher):
+            self.dispatcher = dispatcher
+            self._bound = False
+            socketserver.UnixStreamServer.__init__(self, path, HunspellRequestHandler)
+
+        def server_bind(self):
+            remove_stale_socket(self.server_address)
+            socketserver.UnixStreamServer.server_bind(self)
+            self._bound = True
+
+        def server_close(self):
+            socketserver.UnixStreamServer.server_close(self)
+            # Only remove the socket file if it is ours, a failed bind leaves it untouched
+            if self._bound:
+                self._bound = False
+                try:
+                    os.unlink(self.server_address)
+                except OSError:
+                    pass
+else:
+    HunspellUnixServer = None
+
+
+def create_server(hunspell, socket_path=None, host='127.0.0.1', port=None,
+        batch_window=0.002, max_batch=4096, bulk_threshold=32, file_dirs=()):
+    '''Builds a (not yet serving) server around a hunspell instance'''
+    if not socket_path and port is not None and not is_loopback(host):
+        # Clients are not authenticated, so the server must never be reachable off the host
+        raise ValueError("The hunspell server only listens on loopback addresses, not '{}'".format(host))
+    dispatcher = BatchDispatcher(hunspell, batch_window=batch_window, max_batch=max_batch,
+        bulk_threshold=bulk_threshold, file_dirs=file_dirs)
+    if socket_path:
+        if HunspellUnixServer is None:
+            raise OSError("Unix sockets are not supported on this platform")
+        server = HunspellUnixServer(socket_path, dispatcher)
+    elif port is not None:
+        server = HunspellTCPServer((host, port), dispatcher)
+    else:
+        raise ValueError("Either a socket path or a port is required")
+    dispatcher.start()
+    return server
+
+
+def shutdown_server(server):
+    server.shutdown()
+    server.server_close()
+    server.dispatcher.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hunspell.serve',
+        description='Serve a shared set of hunspell dictionaries and caches to local processes')
+    parser.add_argument('--lang', default='en_US')
+    parser.add_argument('--socket', dest='socket_path', default=None,
+        help='Unix socket path to listen on')
+    parser.add_argument('--host', default='127.0.0.1',
+        help='Loopback address to listen on, the server has no authentication')
+    parser.add_argument('--port', type=int, default=None,
+        help='Local TCP port to listen on when no socket path is given')
+    parser.add_argument('--allow-files-from', dest='file_dirs', action='append', default=[],
+        metavar='DIR', help='Let clients add dictionaries and load wordlists from files in DIR')
+    parser.add_argument('--hunspell-data-dir', default=None)
+    parser.add_argument('--disk-cache-dir', default=None)
+    parser.add_argument('--cache-manager', default='hunspell')
+    parser.add_argument('--threads', type=int, default=None,
+        help='Concurrency of bulk requests, defaults to the number of CPUs')
+    parser.add_argument('--batch-window-ms', type=float, default=2.0,
+        help='How long to hold a request open for other requests to join its batch')
+    parser.add_argument('--max-batch', type=int, default=4096)
+    parser.add_argument('--bulk-threshold', type=int, default=32,
+        help='Minimum uncached words in a batch before the threaded bulk engine is used')
+    args = parser.parse_args(argv)
+    if not args.socket_path and args.port is None:
+        parser.error('one of --socket or --port is required')
+    if not args.socket_path and not is_loopback(args.host):
+        parser.error('--host must be a loopback address, the server has no authentication')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    hunspell = HunspellWrap(args.lang,
+        cache_manager=args.cache_manager,
+        disk_cache_dir=args.disk_cache_dir,
+        hunspell_data_dir=args.hunspell_data_dir)
+    if args.threads:
+        hunspell.set_concurrency(args.threads)
+
+    server = create_server(hunspell,
+        socket_path=args.socket_path,
+        host=args.host,
+        port=args.port,
+        batch_window=args.batch_window_ms / 1000.0,
+        max_batch=args.max_batch,
+        bulk_threshold=args.bulk_threshold,
+        file_dirs=args.file_dirs)
+    print("Serving hunspell '{}' on {}".format(args.lang, server.server_address), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.dispatcher.stop()
+        if args.disk_cache_dir:
+            hunspell.save_cache()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+import os
+import mmap
+import errno
+import time
+import zlib
+import struct
+import threading
+from collections.abc import MutableMapping
+
+from .protocol import encode_value, decode_value, ProtocolError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# File layout of a shared cache, every process maps the same file:
+#
+#   header (64 bytes): magic, version, n_sets, ways, slot_size, n_stripes, generation
+#   n_sets * ways slots of slot_size bytes each
+#
+# A key hashes to one set and may live in any of that set's `ways` slots. When a set is
+# full the least recently used slot is evicted, which keeps the file at a fixed size.
+# Sets are guarded by striped POSIX byte-range locks shared between processes. Those locks
+# belong to the process rather than the thread or the descriptor, and closing any descriptor
+# of a file drops all of them (including the one mmap duplicates). So every cache object in
+# a process opening the same file shares one descriptor and mapping, closed along with the
+# last of them, and a lock per file makes sure a process holds (or waits for) at most one
+# range of each file at a time (otherwise the kernel's deadlock detection trips over threads
+# waiting on each other's stripes). Threads using different files don't wait on each other,
+# but as the kernel tracks waits per process, two processes each holding a range of one file
+# while waiting on the other file can still be reported as a deadlock. Such waits are retried.
+# Clearing bumps the generation: slots written under an older generation are empty.
+# Keys may carry a namespace, which lets differently configured users of a file (such as
+# dictionaries changed at runtime) keep their results apart without a file of their own.
+
+MAGIC = b'HSPLSHM1'
+VERSION = 1
+DEFAULT_SIZE = 64 * 1024 * 1024
+DEFAULT_SLOT_SIZE = 512
+DEFAULT_WAYS = 8
+DEFAULT_STRIPES = 64
+
+_HEADER = struct.Struct('>8sIIIIIQ')
+_HEADER_SIZE = 64
+_GENERATION_OFFSET = 28
+_GENERATION = struct.Struct('>Q')
+# generation, last access stamp, key hash, key length, value length
+_SLOT = struct.Struct('>QQIHI')
+_SLOT_HEADER_SIZE = 32
+# Lock byte for creating / clearing the file, stripe locks follow it
+_INIT_LOCK = 0
+_MISSING = object()
+# Pause before retrying a range the kernel reported as deadlocked
+_DEADLOCK_RETRY_DELAY = 0.001
+
+
+# Serializes opening and closing of cache files
+_files_lock = threading.Lock()
+# Descriptor shared by the cache objects on each file, by (st_dev, st_ino)
+_open_files = {}
+
+
+class SharedCacheError(OSError):
+    pass
+
+
+class _SharedFile(object):
+    def __init__(self, key, fd):
+        self.key = key
+        self.fd = fd
+        self.map = None
+        self.users = 0
+        # Serializes range locking of the file within the process
+        self.lock = threading.RLock()
+
+
+def _open_shared_file(path):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    stat = os.fstat(fd)
+    key = (stat.st_dev, stat.st_ino)
+    with _files_lock:
+        shared = _open_files.get(key)
+        if shared is None:
+            shared = _open_files[key] = _SharedFile(key, fd)
+            fd = None
+        shared.users += 1
+    if fd is not None:
+        # Nothing holds a range lock of the file while its lock is held, so closing drops none
+        with shared.lock:
+            os.close(fd)
+    return shared
+
+
+def _close_shared_file(shared):
+    with _files_lock:
+        shared.users -= 1
+        if shared.users == 0:
+            del _open_files[shared.key]
+            if shared.map is not None:
+                shared.map.close()
+            os.close(shared.fd)
+
+
+def _encode_key(key):
+    if isinstance(key, bytes):
+        return b'b' + key
+    return b's' + key.encode('utf-8', 'surrogatepass')
+
+
+def _namespace_prefix(namespace):
+    # Plain keys start with b'b' or b's', namespaced ones with b'n'
+    if not namespace:
+        return b''
+    return b'n' + namespace.encode('utf-8', 'surrogatepass') + b'\0'
+
+
+def _decode_key(raw):
+    if raw[:1] == b'b':
+        return raw[1:]
+    return raw[1:].decode('utf-8', 'surrogatepass')
+
+
+def _stamp():
+    return int(time.time() * 1000000)
+
+
+class SharedMemoryCache(MutableMapping):
+    '''
+    A dict-like result cache backed by a memory mapped file which any number of processes
+    can read and write concurrently. Place the file on a tmpfs such as /dev/shm to keep it
+    purely in memory, results which don't fit in a slot are simply not cached.
+    '''
+    def __init__(self, path, size=DEFAULT_SIZE, slot_size=DEFAULT_SLOT_SIZE, ways=DEFAULT_WAYS,
+            stripes=DEFAULT_STRIPES):
+        if fcntl is None:
+            raise SharedCacheError("Shared caches require POSIX file locking (fcntl)")
+        if slot_size <= _SLOT_HEADER_SIZE:
+            raise ValueError("Slot size must be larger than {} bytes".format(_SLOT_HEADER_SIZE))
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._namespace = u''
+        self._prefix = b''
+        self._map = None
+        self._file = None
+        self._file = _open_shared_file(path)
+        self._fd = self._file.fd
+        try:
+            with self._file.lock:
+                self._lock_range(_INIT_LOCK)
+                try:
+                    self._initialize(size, slot_size, ways, stripes)
+                finally:
+                    self._unlock_range(_INIT_LOCK)
+                if self._file.map is None:
+                    self._file.map = mmap.mmap(self._fd, self._file_size)
+            self._map = self._file.map
+        except:
+            self.close()
+            raise
+        self._last_found = threading.local()
+
+    def _initialize(self, size, slot_size, ways, stripes):
+        existing_size = os.fstat(self._fd).st_size
+        if existing_size == 0:
+            n_sets = max(1, (size - _HEADER_SIZE) // (ways * slot_size))
+            stripes = max(1, min(stripes, n_sets))
+            header = _HEADER.pack(MAGIC, VERSION, n_sets, ways, slot_size, stripes, 1)
+            os.ftruncate(self._fd, _HEADER_SIZE + n_sets * ways * slot_size)
+            os.pwrite(self._fd, header, 0)
+        else:
+            # Another process created the file first, adopt its geometry
+            header = os.pread(self._fd, _HEADER.size, 0)
+        magic, version, n_sets, ways, slot_size, stripes, _ = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise SharedCacheError("File '{}' is not a hunspell shared cache".format(self.path))
+        self.n_sets = n_sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.n_stripes = stripes
+        self._file_size = _HEADER_SIZE + n_sets * ways * slot_size
+        if os.fstat(self._fd).st_size < self._file_size:
+            raise SharedCacheError("Shared cache '{}' is truncated".format(self.path))
+
+    @property
+    def namespace(self):
+        '''Entries are only visible to cache objects using the same namespace'''
+        return self._namespace
+
+    @namespace.setter
+    def namespace(self, namespace):
+        self._last_found.entry = None
+        self._namespace = namespace or u''
+        self._prefix = _namespace_prefix(namespace)
+
+    def _in_namespace(self, raw_key):
+        if self._prefix:
+            return raw_key.startswith(self._prefix)
+        return raw_key[:1] != b'n'
+
+    def close(self):
+        # The mapping is shared with other objects on the file, it is closed with the last one
+        self._map = None
+        if self._file is not None:
+            _close_shared_file(self._file)
+            self._file = None
+            self._fd = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    ###################
+    # Locking
+    ###################
+
+    def _lock_range(self, offset):
+        while True:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, offset)
+                return
+            except OSError as e:
+                if e.errno != errno.EDEADLK:
+                    raise
+            # A wait across files the kernel can't tell apart from a deadlock, see above
+            time.sleep(_DEADLOCK_RETRY_DELAY)
+
+    def _unlock_range(self, offset):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, offset)
+
+    def _acquire(self, stripe):
+        self._file.lock.acquire()
+        try:
+            self._lock_range(stripe + 1)
+        except:
+            self._file.lock.release()
+            raise
+
+    def _release(self, stripe):
+        try:
+            self._unlock_range(stripe + 1)
+        finally:
+            self._file.lock.release()
+
+    ###################
+    # Slot access
+    ###################
+
+    def _generation(self):
+        return _GENERATION.unpack_from(self._map, _GENERATION_OFFSET)[0]
+
+    def _slot_offset(self, set_index, way):
+        return _HEADER_SIZE + (set_index * self.ways + way) * self.slot_size
+
+    def _find(self, set_index, key_hash, raw_key, generation):
+        '''Returns the offset of the slot holding raw_key in the set, or None'''
+        for way in range(self.ways):
+            offset = self._slot_offset(set_index, way)
+            slot_gen, _, slot_hash, key_len, _ = _SLOT.unpack_from(self._map, offset)
+            if slot_gen != generation or slot_hash != key_hash or key_len != len(raw_key):
+                continue
+            start = offset + _SLOT_HEADER_SIZE
+            if self._map[start:start + key_len] == raw_key:
+                return offset
+        return None
+
+    def _locate(self, key):
+        raw_key = self._prefix + _encode_key(key)
+        key_hash = zlib.crc32(raw_key) & 0xffffffff
+        set_index = key_hash % self.n_sets
+        return raw_key, key_hash, set_index, set_index % self.n_stripes
+
+    def _get(self, key):
+        raw_key, key_hash, set_index, stripe = self._locate(key)
+        raw_value = None
+        self._acquire(stripe)
+        try:
+            generation = self._generation()
+            offset = self._find(set_index, key_hash, raw_key, generation)
+            if offset is not None:
+                _, _, _, key_len, value_len = _SLOT.unpack_from(self._map, offset)
+                start = offset + _SLOT_HEADER_SIZE + key_len
+                raw_value = self._map[start:start + value_len]
+                # Refresh the stamp so frequently used results survive eviction
+                _SLOT.pack_into(self._map, offset, generation, _stamp(), key_hash, key_len, value_len)
+        finally:
+            self._release(stripe)
+        if raw_value is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        try:
+            return decode_value(raw_value)
+        except ProtocolError:
+            raise KeyError(key)
+
+    def __getitem__(self, key):
+        # Hand back the value found by a preceding `key in cache` check. Another process
+        # may have evicted it since, which would otherwise turn the hit into a KeyError.
+        last = getattr(self._last_found, 'entry', None)
+        if last is not None:
+            self._last_found.entry = None
+            if last[0] == key and type(last[0]) is type(key):
+                return last[1]
+        return self._get(key)
+
+    def __contains__(self, key):
+        try:
+            self._last_found.entry = (key, self._get(key))
+        except KeyError:
+            self._last_found.entry = None
+            return False
+        return True
+
+    def __setitem__(self, key, value):
+        self._last_found.entry = None
+        raw_key, key_hash, set_index, stripe = self._locate(key)
+        raw_value = encode_value(value)
+        if _SLOT_HEADER_SIZE + len(raw_key) + len(raw_value) > self.slot_size:
+            # Too large to share, callers just recompute it next time
+            return
+        self._acquire(stripe)
+        try:
+            generation = self._generation()
+            offset = self._find(set_index, key_hash, raw_key, generation)
+            if offset is None:
+                offset = self._victim(set_index, generation)
+            start = offset + _SLOT_HEADER_SIZE
+            self._map[start:start + len(raw_key)] = raw_key
+            self._map[start + len(raw_key):start + len(raw_key) + len(raw_value)] = raw_value
+            # Header last, so a torn write is never seen as a valid entry by a later reader
+            _SLOT.pack_into(self._map, offset, generation, _stamp(), key_hash, len(raw_key), len(raw_value))
+        finally:
+            self._release(stripe)
+
+    def _victim(self, set_index, generation):
+        '''Picks a free slot in the set, or evicts the least recently used one'''
+        oldest_offset = None
+        oldest_stamp = None
+        for way in range(self.ways):
+            offset = self._slot_offset(set_index, way)
+            slot_gen, stamp, _, key_len, _ = _SLOT.unpack_from(self._map, offset)
+            if slot_gen != generation or key_len == 0:
+                return offset
+            if oldest_stamp is None or stamp < oldest_stamp:
+                oldest_offset = offset
+                oldest_stamp = stamp
+        self.evictions += 1
+        return oldest_offset
+
+    def __delitem__(self, key):
+        self._last_found.entry = None
+        raw_key, key_hash, set_index, stripe = self._locate(key)
+        self._acquire(stripe)
+        try:
+            offset = self._find(set_index, key_hash, raw_key, self._generation())
+            if offset is not None:
+                _SLOT.pack_into(self._map, offset, 0, 0, 0, 0, 0)
+        finally:
+            self._release(stripe)
+        if offset is None:
+            raise KeyError(key)
+
+    def pop(self, key, default=_MISSING):
+        # Found and deleted under one lock, another process may remove it in between otherwise
+        self._last_found.entry = None
+        raw_key, key_hash, set_index, stripe = self._locate(key)
+        raw_value = None
+        self._acquire(stripe)
+        try:
+            offset = self._find(set_index, key_hash, raw_key, self._generation())
+            if offset is not None:
+                _, _, _, key_len, value_len = _SLOT.unpack_from(self._map, offset)
+                start = offset + _SLOT_HEADER_SIZE + key_len
+                raw_value = self._map[start:start + value_len]
+                _SLOT.pack_into(self._map, offset, 0, 0, 0, 0, 0)
+        finally:
+            self._release(stripe)
+        try:
+            if raw_value is not None:
+                return decode_value(raw_value)
+        except ProtocolError:
+            pass
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def _iter_raw_keys(self):
+        for set_index in range(self.n_sets):
+            stripe = set_index % self.n_stripes
+            keys = []
+            self._acquire(stripe)
+            try:
+                generation = self._generation()
+                for way in range(self.ways):
+                    offset = self._slot_offset(set_index, way)
+                    slot_gen, _, _, key_len, _ = _SLOT.unpack_from(self._map, offset)
+                    if slot_gen == generation and key_len:
+                        start = offset + _SLOT_HEADER_SIZE
+                        keys.append(self._map[start:start + key_len])
+            finally:
+                self._release(stripe)
+            for raw_key in keys:
+                yield raw_key
+
+    def __iter__(self):
+        # Snapshot per set, entries may come and go while iterating
+        for raw_key in self._iter_raw_keys():
+            if self._in_namespace(raw_key):
+                yield _decode_key(raw_key[len(self._prefix):])
+
+    def __len__(self):
+        return sum(1 for raw_key in self._iter_raw_keys() if self._in_namespace(raw_key))
+
+    def clear(self):
+        # Drops the entries of every namespace
+        self._last_found.entry = None
+        with self._file.lock:
+            self._lock_range(_INIT_LOCK)
+            try:
+                _GENERATION.pack_into(self._map, _GENERATION_OFFSET, self._generation() + 1)
+            finally:
+                self._unlock_range(_INIT_LOCK)
+
+    def save(self):
+        self._map.flush()
+
+    def stats(self):
+        '''Hit, miss and eviction counts seen by this process'''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'capacity': self.n_sets * self.ways,
+        }
@@ -1,4 +1,4 @@
-cdef extern from "thread.hpp":
+cdef extern from "thread.hpp" nogil:
     ctypedef void *thread_t
 
     void dealloc_threads(thread_t **threads, int num_threads)
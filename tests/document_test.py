@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import random
+import pytest
+
+from hunspell import Hunspell
+from hunspell import document
+from hunspell.document import DocumentSession, Diagnostic
+
+
+DICT_DIR = os.path.join(os.path.dirname(__file__), '..', 'hunspell', 'dictionaries')
+
+
+class RecordingChecker(object):
+    '''Knows a fixed vocabulary and records every word it is asked about'''
+    def __init__(self, known):
+        self.known = set(known)
+        self.spelled = []
+        self.suggested = []
+
+    def spell(self, word):
+        self.spelled.append(word)
+        return word in self.known
+
+    def suggest(self, word):
+        self.suggested.append(word)
+        return tuple(sorted(known for known in self.known if known[0] == word[0]))
+
+    def bulk_suggest(self, words):
+        return dict((word, self.suggest(word)) for word in words)
+
+
+@pytest.fixture
+def checker():
+    return RecordingChecker(['the', 'quick', 'brown', 'fox', 'dog', "don't", 'makan-makan'])
+
+
+def test_open_tokenizes_and_checks(checker):
+    session = DocumentSession(checker, u"the quikc brown fox, the dgo")
+    assert len(session) == 6
+    assert session.diagnostics() == [
+        Diagnostic(4, 9, 'quikc', ('quick',)),
+        Diagnostic(25, 28, 'dgo', ('dog', "don't")),
+    ]
+    # Repeated words are only checked once
+    assert sorted(checker.spelled) == ['brown', 'dgo', 'fox', 'quikc', 'the']
+
+
+def test_inner_punctuation(checker):
+    session = DocumentSession(checker, u"don't makan-makan -fox- 42 x_y")
+    assert [d.word for d in session.diagnostics()] == ['x', 'y']
+
+
+def test_fix_typo(checker):
+    session = DocumentSession(checker, u"the quikc brown fox")
+    checker.spelled = []
+    changes = session.apply_edit(4, 9, u'quick')
+    assert changes.added == []
+    assert changes.removed == [Diagnostic(4, 9, 'quikc', ('quick',))]
+    assert session.text == u'the quick brown fox'
+    assert session.diagnostics() == []
+    assert checker.spelled == ['quick']
+
+
+def test_introduce_typo_shifts_later_tokens(checker):
+    session = DocumentSession(checker, u"the fox and the dgo")
+    changes = session.apply_edit(4, 4, u'brwn ')
+    assert changes.added == [Diagnostic(4, 8, 'brwn', ('brown',))]
+    # 'and' and 'dgo' moved but didn't change, so they aren't reported again
+    assert changes.removed == []
+    assert [(d.start, d.end, d.word) for d in session.diagnostics()] == [
+        (4, 8, 'brwn'), (13, 16, 'and'), (21, 24, 'dgo')]
+
+
+def test_only_new_words_are_queried(checker):
+    session = DocumentSession(checker, u' '.join([u'the quick brown fox'] * 500))
+    checker.spelled = []
+    checker.suggested = []
+    session.apply_edit(0, 3, u'teh')
+    assert checker.spelled == ['teh']
+    assert checker.suggested == ['teh']
+    # Words still in the document keep their state, nothing to query
+    session.apply_edit(4, 9, u'brown')
+    assert checker.spelled == ['teh']
+
+
+def test_edit_joins_and_splits_words(checker):
+    session = DocumentSession(checker, u"the quick brown")
+    changes = session.apply_edit(9, 10, u'')
+    assert changes.added == [Diagnostic(4, 14, 'quickbrown', ('quick',))]
+    changes = session.apply_edit(9, 9, u' ')
+    assert changes.removed == [Diagnostic(4, 14, 'quickbrown', ('quick',))]
+    assert changes.added == []
+    assert session.text == u'the quick brown'
+
+
+def test_matches_full_recheck(checker):
+    session = DocumentSession(checker, u"the quick brown fox jumps over the lazy dog")
+    edits = [(0, 0, u'Oh, '), (8, 13, u'slow'), (20, 20, u'-ish'), (10, 30, u''),
+        (5, 5, u'dgo dog'), (0, 17, u'fox'), (3, 3, u"don't")]
+    for start, end, new_text in edits:
+        before = set(session.diagnostics())
+        changes = session.apply_edit(start, end, new_text)
+        fresh = DocumentSession(checker, session.text)
+        assert session.diagnostics() == fresh.diagnostics()
+        assert len(session) == len(fresh)
+        after = set(session.diagnostics())
+        assert set(changes.added) <= after
+        assert set(changes.removed) <= before
+
+
+def test_edits_across_chunks(checker, monkeypatch):
+    monkeypatch.setattr(document, 'CHUNK_SIZE', 16)
+    rand = random.Random(7)
+    pieces = [u'the', u'dgo', u'fox', u'quikc', u' ', u'  ', u', ', u'-', u"'", u'']
+    session = DocumentSession(checker, u' '.join([u'the quick brwn fox'] * 20))
+    assert len(session._chunk_texts) > 1
+    for _ in range(300):
+        start = rand.randint(0, len(session.text))
+        end = min(len(session.text), start + rand.choice([0, 0, 1, 3, 8, 40]))
+        before = set(session.diagnostics())
+        changes = session.apply_edit(start, end, rand.choice(pieces))
+        fresh = DocumentSession(checker, session.text)
+        assert session.diagnostics() == fresh.diagnostics()
+        assert len(session) == len(fresh)
+        assert set(changes.added) <= set(session.diagnostics())
+        assert set(changes.removed) <= before
+
+
+def test_edit_only_rewrites_its_chunks(checker):
+    session = DocumentSession(checker, u' '.join([u'the quick brown fox'] * 5000))
+    chunks = list(session._chunk_texts)
+    assert len(chunks) > 10
+    session.apply_edit(50000, 50000, u'dgo ')
+    # Later chunks kept their text and tokens, only their offsets moved
+    kept = set(id(text) for text in session._chunk_texts)
+    assert sum(1 for text in chunks if id(text) in kept) == len(chunks) - 1
+    assert session.text[50000:50004] == u'dgo '
+    assert [d.start for d in session.diagnostics()] == [50000]
+
+
+def test_suggest_disabled(checker):
+    session = DocumentSession(checker, u"the dgo", suggest=False)
+    assert session.diagnostics() == [Diagnostic(4, 7, 'dgo', ())]
+    assert checker.suggested == []
+
+
+def test_bad_edit_range(checker):
+    session = DocumentSession(checker, u"the fox")
+    with pytest.raises(ValueError):
+        session.apply_edit(5, 4, u'')
+    with pytest.raises(ValueError):
+        session.apply_edit(0, 8, u'')
+
+
+def test_recheck_after_dictionary_change(checker):
+    session = DocumentSession(checker, u"the dgo")
+    checker.known.add('dgo')
+    assert len(session.diagnostics()) == 1
+    assert session.recheck() == []
+
+
+def test_failed_check_leaves_session_unchanged(checker):
+    session = DocumentSession(checker, u"the fox")
+    checker.spell = lambda word: 1 / 0
+    with pytest.raises(ZeroDivisionError):
+        session.apply_edit(3, 3, u' dgo')
+    assert session.text == u'the fox'
+    assert len(session) == 2
+    assert sorted(session._word_counts) == ['fox', 'the']
+    del checker.spell
+    assert session.recheck() == []
+
+
+def test_words_the_dictionary_cannot_encode():
+    hunspell = Hunspell('id_ID', hunspell_data_dir=DICT_DIR)
+    session = hunspell.open_document(u'rumah 日本')
+    assert session.diagnostics() == [Diagnostic(6, 8, u'日本', ())]
+    changes = session.apply_edit(8, 8, u' 東京 rumah')
+    assert changes.added == [Diagnostic(9, 11, u'東京', ())]
+    assert [d.word for d in session.recheck()] == [u'日本', u'東京']
+
+
+def test_hunspell_open_document():
+    hunspell = Hunspell('test', hunspell_data_dir=DICT_DIR)
+    session = hunspell.open_document(u'the dpg barked')
+    assert [(d.start, d.end, d.word) for d in session.diagnostics()] == [(4, 7, 'dpg')]
+    assert session.diagnostics()[0].suggestions == hunspell.suggest('dpg')
+    changes = session.apply_edit(5, 6, u'o')
+    assert changes.added == []
+    assert [d.word for d in changes.removed] == ['dpg']
+    assert session.diagnostics() == []
@@ -6,13 +6,15 @@ import sys
 import pytest
 import shutil
 import tempfile
+import threading
 
 from unittest.mock import patch
 from io import StringIO
 
 from contextlib import contextmanager
 from cacheman.cacher import get_cache_manager
-from hunspell import Hunspell, HunspellFilePathError
+from hunspell import Hunspell, MultiHunspell, HunspellFilePathError
+from hunspell.hunspell import merge_suggestions
 
 
 DICT_DIR = os.path.join(os.path.dirname(__file__), '..', 'hunspell', 'dictionaries')
@@ -59,6 +61,29 @@ def hunspell():
     return Hunspell('test', hunspell_data_dir=DICT_DIR)
 
 
+@pytest.fixture
+def jargon_dir():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(temp_dir, 'jargon.aff'), 'w') as aff:
+            aff.write('SET UTF-8\nTRY esianrtolcdugmphbyfvkwz\n')
+        with open(os.path.join(temp_dir, 'jargon.dic'), 'w') as dic:
+            dic.write('3\nkubernetes\ndpgx\nfrob\n')
+        yield temp_dir
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def multi_hunspell(jargon_dir):
+    multi = MultiHunspell([
+        Hunspell('test', hunspell_data_dir=DICT_DIR),
+        Hunspell('jargon', hunspell_data_dir=jargon_dir),
+    ], cache_manager='multi_test')
+    multi.clear_cache()
+    return multi
+
+
 def test_create_destroy(hunspell):
     del hunspell
 
@@ -177,6 +202,165 @@ def test_remove(hunspell):
     assert 'dog' not in hunspell.suggest('dog')
 
 
+def test_add_visible_to_bulk(hunspell):
+    hunspell.set_concurrency(2)
+    hunspell.clear_cache()
+    hunspell.bulk_stem(['dog', 'cat'])
+    word = 'outofvocabularyword'
+    hunspell.add(word)
+    hunspell.set_concurrency(3)
+    assert hunspell.bulk_suggest([word, 'dpg'])[word] == (word,)
+
+
+def test_bulk_add(hunspell):
+    hunspell.set_concurrency(2)
+    hunspell.clear_cache()
+    hunspell.bulk_stem(['dog', 'cat'])
+    words = ['outofvocabularyword', 'anotheroutofvocabularyword', u'caf\udcc3']
+    result = hunspell.bulk_add(words)
+    assert result['status'] == [0, 0, -1]
+    # Repeated words keep a status each
+    assert hunspell.bulk_add(['zqxword', 'zqxword'])['status'] == [0, 0]
+    assert result['instances'] == 3
+    assert result['apply_time'] >= 0
+    assert hunspell.spell('outofvocabularyword')
+    assert hunspell.bulk_suggest(words[:2]) == {word: (word,) for word in words[:2]}
+
+
+def test_bulk_add_with_affix(hunspell):
+    result = hunspell.bulk_add(['outofvocabularyword', 'bazword'], {'outofvocabularyword': 'example'})
+    assert result['status'] == [0, 0]
+    assert hunspell.spell('outofvocabularyword')
+    assert hunspell.spell('bazword')
+
+
+def test_bulk_remove(hunspell):
+    hunspell.set_concurrency(2)
+    assert 'dog' in hunspell.suggest('dpg')
+    hunspell.clear_cache()
+    hunspell.bulk_stem(['cat', 'dog'])
+    result = hunspell.bulk_remove(['dog', 'cat'])
+    assert result['status'] == [0, 0]
+    assert not hunspell.spell('dog')
+    assert 'dog' not in hunspell.suggest('dpg')
+    assert hunspell.bulk_stem(['cat', 'dog']) == {'cat': (), 'dog': ()}
+
+
+def test_load_wordlist(hunspell):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'glossary.txt')
+        with open(path, 'wb') as wordlist:
+            wordlist.write(u'outofvocabularyword\r\nbazword/example\n\n*dog\ncaf\u00e9word\n'.encode('utf-8'))
+        hunspell.set_concurrency(2)
+        hunspell.clear_cache()
+        hunspell.bulk_stem(['cat', 'dog'])
+        result = hunspell.load_wordlist(path)
+        assert result['words'] == ['outofvocabularyword', 'bazword', 'dog', u'caf\u00e9word']
+        assert result['status'] == [0, 0, 0, 0]
+        assert hunspell.spell(u'caf\u00e9word')
+        assert not hunspell.spell('dog')
+        assert hunspell.bulk_stem(['dog']) == {'dog': ()}
+    finally:
+        shutil.rmtree(temp_dir)
+
+    with pytest.raises(HunspellFilePathError):
+        hunspell.load_wordlist(os.path.join(DICT_DIR, 'not_avail.txt'))
+
+
+def test_add_refreshes_suggestions(hunspell):
+    assert 'kubernetes' not in hunspell.suggest('kubernetez')
+    hunspell.bulk_add(['kubernetes'])
+    assert 'kubernetes' in hunspell.suggest('kubernetez')
+
+
+def test_add_with_affix_refreshes_forms(hunspell):
+    assert hunspell.stem('outofvocabularywords') == ()
+    assert hunspell.analyze('outofvocabularywords') == ()
+    hunspell.bulk_add(['outofvocabularyword'], {'outofvocabularyword': 'dog'})
+    assert hunspell.stem('outofvocabularywords') == ('outofvocabularyword',)
+    assert hunspell.analyze('outofvocabularywords') != ()
+
+
+def test_remove_drops_derived_results(hunspell):
+    hunspell.bulk_add(['outofvocabularyword'], {'outofvocabularyword': 'dog'})
+    assert hunspell.stem('outofvocabularywords') == ('outofvocabularyword',)
+    assert hunspell.analyze('outofvocabularywords') != ()
+    hunspell.remove('outofvocabularyword')
+    assert hunspell.stem('outofvocabularywords') == ()
+    assert hunspell.analyze('outofvocabularywords') == ()
+
+
+def test_changes_stay_private(hunspell):
+    hunspell.clear_cache()
+    other = Hunspell('test', hunspell_data_dir=DICT_DIR)
+    assert other.stem('dog') == ('dog',)
+    hunspell.remove('dog')
+    assert hunspell.stem('dog') == ()
+    assert other.stem('dog') == ('dog',)
+    assert 'dog' in other.suggest('dpg')
+    assert Hunspell('test', hunspell_data_dir=DICT_DIR).stem('dog') == ('dog',)
+
+
+def test_bulk_mutations_alongside_bulk_requests(hunspell):
+    hunspell.set_concurrency(2)
+    added = ['outofvocabularyword{}'.format(i) for i in range(50)]
+    errors = []
+
+    def stem_in_bulk(tid):
+        try:
+            for i in range(20):
+                # Fresh words each round so every call reaches the thread instances
+                stems = hunspell.bulk_stem(['dog', 'unknownword{}x{}'.format(tid, i)])
+                assert stems['dog'] == ('dog',)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=stem_in_bulk, args=(tid,)) for tid in range(3)]
+    for thread in threads:
+        thread.start()
+    for i in range(0, len(added), 10):
+        hunspell.bulk_add(added[i:i + 10])
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert hunspell.bulk_suggest(added) == {word: (word,) for word in added}
+
+
+def test_mutations_alongside_single_requests(hunspell):
+    added = ['outofvocabularyword{}'.format(i) for i in range(50)]
+    errors = []
+
+    def spell_words(tid):
+        try:
+            for i in range(50):
+                # Uncached words, so every call reaches the main instance
+                assert hunspell.spell('dog')
+                assert not hunspell.spell('unknownword{}x{}'.format(tid, i))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=spell_words, args=(tid,)) for tid in range(3)]
+    for thread in threads:
+        thread.start()
+    for word in added:
+        hunspell.add(word)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert all(hunspell.spell(word) for word in added)
+
+
+def test_bulk_spell(hunspell):
+    hunspell.set_concurrency(2)
+    assert hunspell.bulk_spell(['dog', 'dpg', 'dog', u'café']) == {'dog': True, 'dpg': False, u'café': True}
+    assert hunspell.bulk_spell([]) == {}
+    hunspell.add('dpg')
+    assert hunspell.bulk_spell(['dog', 'dpg']) == {'dog': True, 'dpg': True}
+    with pytest.raises(UnicodeEncodeError):
+        hunspell.bulk_spell(['dog', u'caf\udcc3'])
+
+
 def test_bulk_suggest(hunspell):
     hunspell.set_concurrency(3)
     suggest = hunspell.bulk_suggest(['dog', 'dpg'])
@@ -353,6 +537,38 @@ def test_clear_caches_persistance(hunspell):
         shutil.rmtree(temp_dir) # Nuke temp content
 
 
+def test_save_changed_caches_persistance(hunspell):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        h1 = Hunspell('test',
+            hunspell_data_dir=DICT_DIR,
+            disk_cache_dir=temp_dir,
+            cache_manager='disk_hun_changes')
+        h1.add('zqxword')
+        test_stem = h1.stem('zqxword')
+        h1._suggest_cache['zqx-made-up'] = ('made',)
+        h1.save_cache()
+        fingerprint = h1.changes_fingerprint()
+        del h1
+
+        cacheman = get_cache_manager('disk_hun_changes')
+        cacheman.deregister_all_caches()
+        assert any(name.endswith(fingerprint + '.pkl') for name in os.listdir(temp_dir))
+
+        h2 = Hunspell('test',
+            hunspell_data_dir=DICT_DIR,
+            disk_cache_dir=temp_dir,
+            cache_manager='disk_hun_changes')
+        # The unchanged dictionary's caches don't hold the changed one's results
+        assert 'zqx-made-up' not in h2._suggest_cache
+        h2.add('zqxword')
+        assert h2.changes_fingerprint() == fingerprint
+        assert h2._stem_cache['zqxword'] == test_stem
+        assert h2.suggest('zqx-made-up') == ('made',)
+    finally:
+        shutil.rmtree(temp_dir) # Nuke temp content
+
+
 def test_clear_caches_non_peristance(hunspell):
     test_suggest = hunspell.suggest('testing')
     test_suffix = hunspell.suffix_suggest('testing')
@@ -372,3 +588,108 @@ def test_clear_caches_non_peristance(hunspell):
     assert hunspell.suggest('made-up') != test_suggest
     assert hunspell.suffix_suggest('made-up') != test_suffix
     assert hunspell.stem('made-up') != test_stem
+
+
+def test_merge_suggestions():
+    assert merge_suggestions([('a', 'b', 'c'), ('x', 'b'), ()]) == ('a', 'x', 'b', 'c')
+    assert merge_suggestions([]) == ()
+
+
+def test_multi_missing_dict():
+    with pytest.raises(HunspellFilePathError):
+        MultiHunspell(['test', 'not_avail'], hunspell_data_dir=DICT_DIR)
+    with pytest.raises(ValueError):
+        MultiHunspell([])
+
+
+def test_multi_spell(multi_hunspell):
+    assert multi_hunspell.langs == ('test', 'jargon')
+    assert multi_hunspell.spell('dog')
+    assert multi_hunspell.spell('kubernetes')
+    assert not multi_hunspell.spell('kubernetez')
+
+
+def test_multi_suggest(multi_hunspell):
+    assert multi_hunspell.suggest('dog') == ('dog',)
+    suggest = multi_hunspell.suggest('dpgy')
+    assert isinstance(suggest, tuple)
+    assert 'dpgx' in suggest
+    assert len(suggest) == len(set(suggest))
+    assert 'kubernetes' in multi_hunspell.suggest('kubernetez')
+
+
+def test_multi_bulk(multi_hunspell):
+    multi_hunspell.set_concurrency(3)
+    checked = ['bjn', 'dog', 'dpg', 'frob', 'kubernetes', 'kubernetez', 'qre', 'twg']
+    spelled = multi_hunspell.bulk_spell(checked)
+    assert sorted(spelled.keys()) == checked
+    assert [word for word in checked if spelled[word]] == ['dog', 'frob', 'kubernetes']
+
+    suggest = multi_hunspell.bulk_suggest(checked)
+    assert sorted(suggest.keys()) == checked
+    assert suggest['frob'] == ('frob',)
+    assert 'kubernetes' in suggest['kubernetez']
+    assert 'dog' in suggest['dpg']
+    assert suggest['dpg'] == multi_hunspell.suggest('dpg')
+
+
+def test_multi_sees_mutations(multi_hunspell):
+    multi_hunspell.set_concurrency(2)
+    assert multi_hunspell.bulk_spell(['frobx', 'dog', 'frobxs']) == {'frobx': False, 'dog': True, 'frobxs': False}
+    assert 'frobx' not in multi_hunspell.suggest('frobz')
+    result = multi_hunspell.bulk_add(['frobx'], {'frobx': 'dog'}, lang='test')
+    assert result['status'] == [0]
+    assert multi_hunspell.dictionaries[0].spell('frobx')
+    assert not multi_hunspell.dictionaries[1].spell('frobx')
+    assert multi_hunspell.bulk_spell(['frobx', 'dog', 'frobxs']) == {'frobx': True, 'dog': True, 'frobxs': True}
+    assert 'frobx' in multi_hunspell.suggest('frobz')
+
+    multi_hunspell.bulk_remove(['frobx'], lang='test')
+    assert multi_hunspell.bulk_spell(['frobx', 'dog', 'frobxs']) == {'frobx': False, 'dog': True, 'frobxs': False}
+    assert 'frobx' not in multi_hunspell.suggest('frobz')
+    with pytest.raises(ValueError):
+        multi_hunspell.bulk_add(['frobx'], lang='missing')
+
+
+def test_multi_load_wordlist(multi_hunspell):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'glossary.txt')
+        with open(path, 'w') as wordlist:
+            wordlist.write('frobx\n*frob\n')
+        assert multi_hunspell.bulk_spell(['frobx', 'frob']) == {'frobx': False, 'frob': True}
+        result = multi_hunspell.load_wordlist(path, lang='jargon')
+        assert result['words'] == ['frobx', 'frob']
+        assert result['status'] == [0, 0]
+        assert multi_hunspell.bulk_spell(['frobx', 'frob']) == {'frobx': True, 'frob': False}
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_multi_sees_direct_mutations(multi_hunspell):
+    assert not multi_hunspell.spell('frobx')
+    multi_hunspell.dictionaries[1].add('frobx')
+    assert multi_hunspell.spell('frobx')
+
+
+def test_multi_add_dic(multi_hunspell):
+    multi_hunspell.set_concurrency(2)
+    assert not multi_hunspell.spell('AA')
+    multi_hunspell.add_dic(os.path.join(DICT_DIR, 'a.dic'))
+    assert multi_hunspell.spell('AA')
+    assert multi_hunspell.bulk_spell(['AA', 'AAA', 'dog', 'AAAA']) == {
+        'AA': True, 'AAA': True, 'dog': True, 'AAAA': False}
+
+
+def test_multi_shared_cache(multi_hunspell, jargon_dir):
+    multi_hunspell._suggest_cache['made-up'] = ('made',)
+    assert multi_hunspell.suggest('made-up') == ('made',)
+
+    same_set = MultiHunspell([
+        Hunspell('test', hunspell_data_dir=DICT_DIR),
+        Hunspell('jargon', hunspell_data_dir=jargon_dir),
+    ], cache_manager='multi_test')
+    assert same_set.suggest('made-up') == ('made',)
+
+    other_set = MultiHunspell([Hunspell('test', hunspell_data_dir=DICT_DIR)], cache_manager='multi_test')
+    assert other_set.suggest('made-up') != ('made',)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import pytest
+import socket
+import shutil
+import tempfile
+import threading
+import socketserver
+
+from hunspell import Hunspell, HunspellClient
+from hunspell.protocol import encode_message, decode_message, ProtocolError
+from hunspell.serve import create_server, shutdown_server, parse_args
+
+
+DICT_DIR = os.path.join(os.path.dirname(__file__), '..', 'hunspell', 'dictionaries')
+
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX') and hasattr(socketserver, 'UnixStreamServer')
+requires_unix_sockets = pytest.mark.skipif(not HAS_UNIX_SOCKETS,
+    reason='Unix sockets are not available on this platform')
+
+
+@pytest.fixture
+def server():
+    if not HAS_UNIX_SOCKETS:
+        pytest.skip('Unix sockets are not available on this platform')
+    temp_dir = tempfile.mkdtemp()
+    hunspell = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='serve_test')
+    hunspell.clear_cache()
+    server = create_server(hunspell,
+        socket_path=os.path.join(temp_dir, 'hunspell.sock'), batch_window=0.05, bulk_threshold=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server
+    finally:
+        shutdown_server(server)
+        shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def client(server):
+    with HunspellClient(socket_path=server.server_address) as client:
+        yield client
+
+
+def test_protocol_round_trip():
+    value = ('dog', u'café', 3, 0.5, True, None, {'dpg': ('dog', 'dig')})
+    frame = encode_message(7, value)
+    assert decode_message(frame[4:]) == (7, value)
+
+
+def test_protocol_truncated():
+    frame = encode_message(7, ('dog',))
+    with pytest.raises(ProtocolError):
+        decode_message(frame[4:-1])
+
+
+def test_parse_args_requires_address():
+    with pytest.raises(SystemExit):
+        parse_args(['--lang', 'test'])
+    assert parse_args(['--socket', '/tmp/h.sock']).socket_path == '/tmp/h.sock'
+
+
+@requires_unix_sockets
+def test_socket_path_not_a_socket():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'notes.txt')
+        with open(path, 'w') as f:
+            f.write('keep me')
+        with pytest.raises(OSError):
+            create_server(Hunspell('test', hunspell_data_dir=DICT_DIR), socket_path=path)
+        with open(path) as f:
+            assert f.read() == 'keep me'
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_socket_path_in_use(server, client):
+    with pytest.raises(OSError):
+        create_server(Hunspell('test', hunspell_data_dir=DICT_DIR), socket_path=server.server_address)
+    assert os.path.exists(server.server_address)
+    assert client.spell('dog')
+
+
+@requires_unix_sockets
+def test_stale_socket_replaced():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'hunspell.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        server = create_server(Hunspell('test', hunspell_data_dir=DICT_DIR), socket_path=path)
+        server.server_close()
+        server.dispatcher.stop()
+        assert not os.path.exists(path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_client_matches_hunspell(client):
+    hunspell = Hunspell('test', hunspell_data_dir=DICT_DIR)
+    assert client.spell('dog')
+    assert not client.spell('dpg')
+    assert client.spell(u'café')
+    assert client.suggest('dpg') == hunspell.suggest('dpg')
+    assert client.suggest('dog') == hunspell.suggest('dog')
+    assert client.suffix_suggest('do') == hunspell.suffix_suggest('do')
+    assert client.stem('permanently') == ('permanent',)
+    assert client.analyze('dog') == (' st:dog',)
+    assert client.action('stem', 'dog') == ('dog',)
+
+
+def test_client_bulk(client):
+    suggest = client.bulk_suggest(['dog', 'dpg'])
+    assert sorted(suggest.keys()) == ['dog', 'dpg']
+    assert suggest['dog'] == ('dog',)
+    assert 'dog' in suggest['dpg']
+    assert client.bulk_stem(['dog', 'permanently']) == {
+        'permanently': ('permanent',),
+        'dog': ('dog',)
+    }
+
+
+def test_client_bulk_spell(client):
+    assert client.bulk_spell(['dog', 'dpg', 'dog']) == {'dog': True, 'dpg': False}
+    assert client.bulk_spell(['dog', 'dyg', 'opg']) == {'dog': True, 'dyg': False, 'opg': False}
+
+
+def test_client_mutations(client):
+    word = 'outofvocabularyword'
+    assert not client.spell(word)
+    client.add(word)
+    assert client.spell(word)
+    client.remove(word)
+    assert not client.spell(word)
+    result = client.bulk_add([word, 'bazword'], {'bazword': 'example'})
+    assert result['status'] == (0, 0)
+    assert client.bulk_suggest([word]) == {word: (word,)}
+    assert client.bulk_remove([word, 'bazword'])['status'] == (0, 0)
+    assert not client.spell('bazword')
+
+
+def test_file_operations_disabled(client):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, 'secrets.txt')
+        with open(path, 'w') as f:
+            f.write('zqxsecret\n')
+        with pytest.raises(PermissionError):
+            client.load_wordlist(path)
+        with pytest.raises(PermissionError):
+            client.add_dic(path)
+        assert not client.spell('zqxsecret')
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+@requires_unix_sockets
+def test_file_operations_from_allowed_dir():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        allowed = os.path.join(temp_dir, 'allowed')
+        os.mkdir(allowed)
+        with open(os.path.join(allowed, 'glossary.txt'), 'w') as f:
+            f.write('frobnicate\n*zorble\nkubectl\nkubectl\n')
+        with open(os.path.join(temp_dir, 'secrets.txt'), 'w') as f:
+            f.write('zqxsecret\n')
+        server = create_server(Hunspell('test', hunspell_data_dir=DICT_DIR),
+            socket_path=os.path.join(temp_dir, 'hunspell.sock'), file_dirs=[allowed])
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            with HunspellClient(socket_path=server.server_address) as client:
+                report = client.load_wordlist(os.path.join(allowed, 'glossary.txt'))
+                # Counts only, the lines of the file aren't echoed back
+                assert 'status' not in report
+                assert (report['words'], report['failed']) == (4, 0)
+                assert client.spell('kubectl')
+                with pytest.raises(PermissionError):
+                    client.load_wordlist(os.path.join(allowed, '..', 'secrets.txt'))
+        finally:
+            shutdown_server(server)
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def test_only_loopback_hosts():
+    with pytest.raises(ValueError):
+        create_server(Hunspell('test', hunspell_data_dir=DICT_DIR), host='0.0.0.0', port=0)
+    with pytest.raises(SystemExit):
+        parse_args(['--host', '0.0.0.0', '--port', '7419'])
+    assert parse_args(['--host', '::1', '--port', '7419']).host == '::1'
+
+
+def test_client_remote_errors(client):
+    with pytest.raises(TypeError):
+        client.set_concurrency('many')
+    with pytest.raises(ValueError):
+        client.action('generate', 'dog')
+    # Words the dictionary can't encode fail as they would locally
+    with pytest.raises(UnicodeEncodeError) as error:
+        client.spell(u'caf\udcc3')
+    assert 'surrogates not allowed' in str(error.value)
+    with pytest.raises(UnicodeEncodeError):
+        client.bulk_spell(['dog', u'caf\udcc3'])
+    # Connection is still usable afterwards
+    assert client.spell('dog')
+
+
+def test_concurrent_requests_are_batched(server):
+    words = ['dpg', 'dyg', 'frg', 'opg', 'pgg', 'twg', 'bjn', 'qre']
+    clients = [HunspellClient(socket_path=server.server_address) for _ in words]
+    results = {}
+    try:
+        # Open every connection before sending so the dispatcher waits for all of them
+        for c in clients:
+            c.spell('dog')
+        threads = [
+            threading.Thread(target=lambda c=c, w=w: results.__setitem__(w, c.suggest(w)))
+            for c, w in zip(clients, words)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = clients[0].stats()
+    finally:
+        for c in clients:
+            c.close()
+
+    assert sorted(results.keys()) == sorted(words)
+    assert 'dog' in results['dpg']
+    assert stats['max_batch_size'] > 1
+    assert stats['bulk_calls'] >= 1
+    assert stats['queue_depth'] == 0
+    assert stats['lang'] == 'test'
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import pytest
+import shutil
+import tempfile
+import threading
+import multiprocessing
+
+from hunspell import Hunspell, MultiHunspell
+from hunspell.sharedcache import SharedMemoryCache, SharedCacheError
+
+# Shared caches rely on POSIX file locking, which Windows doesn't have
+fcntl = pytest.importorskip('fcntl')
+
+
+DICT_DIR = os.path.join(os.path.dirname(__file__), '..', 'hunspell', 'dictionaries')
+
+
+@pytest.fixture
+def cache_dir():
+    temp_dir = tempfile.mkdtemp()
+    try:
+        yield temp_dir
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def _write_from_child(path):
+    cache = SharedMemoryCache(path)
+    cache['from-child'] = ('child', u'café')
+    cache.close()
+
+
+def _try_lock_first_stripe(path):
+    fd = os.open(path, os.O_RDWR)
+    try:
+        fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, 1)
+    except OSError:
+        sys.exit(1)
+    finally:
+        os.close(fd)
+    sys.exit(0)
+
+
+def _lockable_from_child(path):
+    child = multiprocessing.Process(target=_try_lock_first_stripe, args=(path,))
+    child.start()
+    child.join()
+    return child.exitcode == 0
+
+
+def test_set_get_delete(cache_dir):
+    cache = SharedMemoryCache(os.path.join(cache_dir, 'test.cache'), size=64 * 1024)
+    assert 'dpg' not in cache
+    cache['dpg'] = ('dog', 'pg')
+    cache[b'raw'] = True
+    assert 'dpg' in cache
+    assert cache['dpg'] == ('dog', 'pg')
+    assert cache[b'raw'] is True
+    assert set(cache.keys()) == set([b'raw', 'dpg'])
+    cache['dpg'] = ('dig',)
+    assert cache['dpg'] == ('dig',)
+    del cache['dpg']
+    assert 'dpg' not in cache
+    assert cache.pop('dpg', None) is None
+    with pytest.raises(KeyError):
+        cache['dpg']
+    cache['dpg'] = ('dog',)
+    assert cache.pop('dpg') == ('dog',)
+    with pytest.raises(KeyError):
+        cache.pop('dpg')
+
+
+def test_contains_then_get_after_overwrite(cache_dir):
+    cache = SharedMemoryCache(os.path.join(cache_dir, 'test.cache'), size=64 * 1024)
+    cache['dpg'] = ('dog',)
+    assert 'dpg' in cache
+    cache['dpg'] = ('dig',)
+    assert cache['dpg'] == ('dig',)
+
+
+def test_oversized_values_skipped(cache_dir):
+    cache = SharedMemoryCache(os.path.join(cache_dir, 'test.cache'), size=64 * 1024, slot_size=64)
+    cache['long'] = tuple('word{}'.format(i) for i in range(100))
+    assert 'long' not in cache
+
+
+def test_fixed_budget_eviction(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    cache = SharedMemoryCache(path, size=16 * 1024, slot_size=128, ways=4)
+    size = os.path.getsize(path)
+    for i in range(1000):
+        cache['word{}'.format(i)] = ('suggestion{}'.format(i),)
+    assert os.path.getsize(path) == size
+    assert len(cache) <= cache.stats()['capacity']
+    assert cache.stats()['evictions'] > 0
+    assert cache['word999'] == ('suggestion999',)
+
+
+def test_clear(cache_dir):
+    cache = SharedMemoryCache(os.path.join(cache_dir, 'test.cache'), size=64 * 1024)
+    cache['dpg'] = ('dog',)
+    cache.clear()
+    assert len(cache) == 0
+    assert 'dpg' not in cache
+    cache['dpg'] = ('dig',)
+    assert cache['dpg'] == ('dig',)
+
+
+def test_shared_between_processes(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    cache = SharedMemoryCache(path, size=64 * 1024)
+    child = multiprocessing.Process(target=_write_from_child, args=(path,))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert cache['from-child'] == ('child', u'café')
+
+
+def test_rejects_foreign_file(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    with open(path, 'wb') as handle:
+        handle.write(b'not a cache' * 10)
+    with pytest.raises(SharedCacheError):
+        SharedMemoryCache(path)
+
+
+def test_hunspell_shared_cache(cache_dir):
+    h1 = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_1',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    h2 = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_2',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    assert isinstance(h1._suggest_cache, SharedMemoryCache)
+
+    h1._suggest_cache['made-up'] = ('made',)
+    assert h2.suggest('made-up') == ('made',)
+    h2.bulk_stem(['dog', 'permanently'])
+    assert 'permanently' in h1._stem_cache
+
+    h1.clear_cache()
+    assert h2.suggest('made-up') != ('made',)
+
+
+def test_changed_dictionary_keeps_shared_results_apart(cache_dir):
+    h1 = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_1',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    h2 = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_2',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    assert h2.stem('dog') == ('dog',)
+
+    h1.remove('dog')
+    assert h1.changes_fingerprint()
+    assert h1.stem('dog') == ()
+    # The unchanged dictionary's results are neither polluted nor dropped
+    assert h2._stem_cache['dog'] == ('dog',)
+    assert h2.stem('dog') == ('dog',)
+
+    # The same changes made elsewhere share the changed dictionary's results
+    h3 = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_3',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    h3.remove('dog')
+    assert h3.changes_fingerprint() == h1.changes_fingerprint()
+    assert h3._stem_cache['dog'] == ()
+
+
+def test_changes_reuse_the_shared_files(cache_dir):
+    h = Hunspell('test', hunspell_data_dir=DICT_DIR, cache_manager='shared_1',
+        shared_cache_dir=cache_dir, shared_cache_size=1024 * 1024)
+    multi = MultiHunspell([h], cache_manager='shared_1', shared_cache_dir=cache_dir,
+        shared_cache_size=1024 * 1024)
+    files = sorted(os.listdir(cache_dir))
+    for i in range(50):
+        h.add(u'frob{}'.format(i))
+        assert h.stem(u'frob{}'.format(i)) == (u'frob{}'.format(i),)
+        assert multi.spell(u'frob{}'.format(i))
+    h.remove(u'frob0')
+    assert not multi.spell(u'frob0')
+    assert sorted(os.listdir(cache_dir)) == files
+
+
+def test_namespaces(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    plain = SharedMemoryCache(path, size=64 * 1024)
+    spaced = SharedMemoryCache(path, size=64 * 1024)
+    spaced.namespace = u'changed'
+    plain['dog'] = ('dog',)
+    spaced['dog'] = ()
+    spaced[b'raw'] = True
+    assert plain['dog'] == ('dog',)
+    assert spaced['dog'] == ()
+    assert list(plain.keys()) == ['dog']
+    assert set(spaced.keys()) == set(['dog', b'raw'])
+    spaced.namespace = None
+    assert spaced['dog'] == ('dog',)
+
+
+def test_objects_on_one_file_exclude_each_other(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    first = SharedMemoryCache(path, size=64 * 1024)
+    second = SharedMemoryCache(path, size=64 * 1024)
+    acquired = threading.Event()
+
+    def acquire_second():
+        second._acquire(0)
+        acquired.set()
+        second._release(0)
+
+    first._acquire(0)
+    thread = threading.Thread(target=acquire_second)
+    thread.start()
+    try:
+        assert not acquired.wait(0.2)
+    finally:
+        first._release(0)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_files_lock_independently(cache_dir):
+    first = SharedMemoryCache(os.path.join(cache_dir, 'first.cache'), size=64 * 1024)
+    second = SharedMemoryCache(os.path.join(cache_dir, 'second.cache'), size=64 * 1024)
+    written = threading.Event()
+
+    def write_second():
+        second['dpg'] = ('dog',)
+        written.set()
+
+    first._acquire(0)
+    thread = threading.Thread(target=write_second)
+    thread.start()
+    try:
+        assert written.wait(5)
+    finally:
+        first._release(0)
+    thread.join()
+    assert second['dpg'] == ('dog',)
+
+
+def test_close_keeps_locks_of_other_objects(cache_dir):
+    path = os.path.join(cache_dir, 'test.cache')
+    first = SharedMemoryCache(path, size=64 * 1024)
+    second = SharedMemoryCache(path, size=64 * 1024)
+    first._acquire(0)
+    try:
+        second.close()
+        del second
+        assert not _lockable_from_child(path)
+    finally:
+        first._release(0)
+    assert _lockable_from_child(path)
+    first['dpg'] = ('dog',)
+    assert first['dpg'] == ('dog',)